@@ -11,8 +11,34 @@ from .loader import (
     summarize_metamodel,
     summarize_instances,
     instance_stats,
+    class_index,
+    load_metamodel_index,
 )
-from .export import export_json, export_edges, build_object_graph, model_dump
+
+# Export helpers pull in the graph/serialization code; load them on first use
+# so metamodel-only callers (and ``emf-read --dump-metamodel``) skip it.
+_EXPORT_ATTRS = frozenset(
+    {
+        "ExpansionResult",
+        "ExportPlan",
+        "build_object_graph",
+        "compute_expansion",
+        "export_edges",
+        "export_json",
+        "model_dump",
+        "run_export_plan",
+        "write_json",
+    }
+)
+
+
+def __getattr__(name: str):
+    if name in _EXPORT_ATTRS:
+        from . import export
+
+        return getattr(export, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "load_metamodel",
@@ -23,8 +49,15 @@ __all__ = [
     "summarize_metamodel",
     "summarize_instances",
     "instance_stats",
+    "class_index",
+    "load_metamodel_index",
     "build_object_graph",
     "export_json",
     "export_edges",
     "model_dump",
+    "ExportPlan",
+    "run_export_plan",
+    "ExpansionResult",
+    "compute_expansion",
+    "write_json",
 ]
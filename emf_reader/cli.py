@@ -1,36 +1,50 @@
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import sys
+from functools import lru_cache, partial
 
-from .export import (
-    dump_instances_by_class,
-    export_edges,
-    export_filtered_instance,
-    export_gml,
-    export_json,
-    export_metamodel_gml,
-    export_metamodel_mermaid,
-    export_metamodel_plantuml,
-    export_mermaid,
-    export_path_ids,
-    export_paths,
-    export_plantuml,
-    preview_prune_metamodel,
-    model_dump,
-    summarize_model,
-)
 from .loader import (
     count_metamodel_classes,
     instance_stats,
     load_instance,
     load_metamodel,
+    load_metamodel_index,
     metamodel_dump,
+    metamodel_index_stats,
     metamodel_stats,
     summarize_instances,
     summarize_metamodel,
+    summarize_metamodel_index,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Flags whose outputs are computed from a loaded instance, most commonly set
+# first so the ``any()`` scan in ``main`` usually stops early.
+_INSTANCE_FLAGS = (
+    "export_json",
+    "export_edges",
+    "dump_instances_json",
+    "export_instance",
+    "dump_instances",
+    "dump_model",
+    "dump_model_json",
+    "export_paths",
+    "export_path_ids",
+    "export_mermaid",
+    "export_plantuml",
+    "export_gml",
+)
+# Metamodel-side flags that need live EPackages rather than the cached index.
+_PACKAGE_FLAGS = (
+    "prune_dry_run",
+    "prune_dry_run_json",
+    "export_metamodel_mermaid",
+    "export_metamodel_plantuml",
+    "export_metamodel_gml",
 )
 
 
@@ -39,8 +53,98 @@ def _configure_logging(verbose: bool) -> None:
     logging.basicConfig(level=level, format="%(levelname)s: %(message)s")
 
 
+def _write_json(payload: dict[str, object], output_path: str) -> None:
+    from .export import write_json
+
+    write_json(payload, output_path)
+
+
+def _csv_set(value: str | None) -> frozenset[str] | None:
+    if not value:
+        return None
+    names = frozenset(sys.intern(token) for token in map(str.strip, value.split(",")) if token)
+    return names or None
+
+
+def _log_traversal_metrics(metrics: dict[str, int] | None, warn_empty: bool = False) -> None:
+    """Log neighbor and expansion metrics, whichever stages produced them."""
+    if not metrics:
+        return
+    expanded = "start_nodes" in metrics
+    if LOGGER.isEnabledFor(logging.INFO):
+        if "seed_nodes" in metrics:
+            LOGGER.info(
+                "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
+                metrics["seed_nodes"],
+                metrics["nodes_seen"],
+                metrics["edges_traversed"],
+                metrics["max_hops"],
+            )
+        if expanded:
+            LOGGER.info(
+                "Expansion metrics: start_nodes=%s nodes_seen=%s edges_traversed=%s "
+                "loops_detected=%s max_depth=%s",
+                metrics["start_nodes"],
+                metrics["nodes_seen"],
+                metrics["edges_traversed"],
+                metrics["loops_detected"],
+                metrics["max_depth"],
+            )
+    if warn_empty and expanded and metrics["start_nodes"] == 0:
+        LOGGER.warning("No expansion start nodes matched the expression")
+
+
+def _log_diagram_export(label: str, output_path: str, stats: dict[str, int]) -> None:
+    LOGGER.info(
+        "Wrote %s: %s (nodes=%s edges=%s)", label, output_path, stats["nodes"], stats["edges"]
+    )
+    _log_traversal_metrics(stats)
+
+
+def _log_json_export(output_path: str, result: tuple[int, dict[str, int] | None]) -> None:
+    count, metrics = result
+    LOGGER.info("Wrote JSON: %s (objects=%s)", output_path, count)
+    _log_traversal_metrics(metrics)
+
+
+def _log_edges_export(output_path: str, result: tuple[int, dict[str, int] | None]) -> None:
+    count, metrics = result
+    LOGGER.info("Wrote edges: %s (edges=%s)", output_path, count)
+    _log_traversal_metrics(metrics)
+
+
+def _log_paths_export(output_path: str, result: tuple[list[str], dict[str, int] | None]) -> None:
+    paths, metrics = result
+    LOGGER.info("Wrote paths: %s (paths=%s)", output_path, len(paths))
+    if paths:
+        LOGGER.info("Expansion paths preview (max 10): %s", ", ".join(paths[:10]))
+    _log_traversal_metrics(metrics, warn_empty=True)
+
+
+def _log_path_ids_export(
+    output_path: str, result: tuple[list[tuple[str, str]], dict[str, int] | None]
+) -> None:
+    pairs, metrics = result
+    LOGGER.info("Wrote path IDs: %s (rows=%s)", output_path, len(pairs))
+    if pairs:
+        LOGGER.info("Path IDs preview (max 10): %s", ", ".join(path for _, path in pairs[:10]))
+    _log_traversal_metrics(metrics, warn_empty=True)
+
+
+# ExportPlan field, CLI dest, and result logger for every run_export_plan output.
+_PLAN_EXPORTS = (
+    ("mermaid", "export_mermaid", partial(_log_diagram_export, "Mermaid")),
+    ("plantuml", "export_plantuml", partial(_log_diagram_export, "PlantUML")),
+    ("gml", "export_gml", partial(_log_diagram_export, "GML")),
+    ("json", "export_json", _log_json_export),
+    ("edges", "export_edges", _log_edges_export),
+    ("paths", "export_paths", _log_paths_export),
+    ("path_ids", "export_path_ids", _log_path_ids_export),
+)
+
+
 def _log_prune_summary(stats: dict[str, object]) -> None:
-    logging.info(
+    LOGGER.info(
         "Prune dry-run: scope=%s total=%s selected=%s pruned=%s roots=%s",
         stats.get("scope", "instance"),
         stats.get("total_objects", stats.get("total_classes")),
@@ -48,256 +152,315 @@ def _log_prune_summary(stats: dict[str, object]) -> None:
         stats.get("pruned_objects", len(stats.get("pruned_classes", {}))),
         stats.get("roots", "n/a"),
     )
-    logging.info(
+    LOGGER.info(
         "Pruned containment edges=%s references=%s",
         stats.get("pruned_containment_edges"),
         stats.get("pruned_reference_edges"),
     )
     pruned_classes = stats.get("pruned_classes", {})
     if isinstance(pruned_classes, dict) and pruned_classes:
-        logging.info("Pruned classes:")
+        LOGGER.info("Pruned classes:")
         for name in sorted(pruned_classes):
-            logging.info("  %s: %s", name, pruned_classes[name])
+            LOGGER.info("  %s: %s", name, pruned_classes[name])
     pruned_names = stats.get("pruned_class_names", [])
     if isinstance(pruned_names, list) and pruned_names:
-        logging.info("Pruned class names:")
+        LOGGER.info("Pruned class names:")
         for name in pruned_names:
-            logging.info("  %s", name)
+            LOGGER.info("  %s", name)
     include_added = stats.get("include_classes_added", [])
     if isinstance(include_added, list) and include_added:
-        logging.info("Added supertypes:")
+        LOGGER.info("Added supertypes:")
         for name in include_added:
-            logging.info("  %s", name)
+            LOGGER.info("  %s", name)
     container_added = stats.get("container_classes_added", [])
     if isinstance(container_added, list) and container_added:
-        logging.info("Added containment classes:")
+        LOGGER.info("Added containment classes:")
         for name in container_added:
-            logging.info("  %s", name)
+            LOGGER.info("  %s", name)
     pruned_containment = stats.get("pruned_containment_features", {})
     if isinstance(pruned_containment, dict) and pruned_containment:
-        logging.info("Pruned containment by feature: %s", pruned_containment)
+        LOGGER.info("Pruned containment by feature: %s", pruned_containment)
     pruned_refs = stats.get("pruned_reference_features", {})
     if isinstance(pruned_refs, dict) and pruned_refs:
-        logging.info("Pruned references by feature: %s", pruned_refs)
+        LOGGER.info("Pruned references by feature: %s", pruned_refs)
 
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Read EMF .ecore metamodels and instance files.")
-    parser.add_argument("--ecore", required=True, help="Path to .ecore file")
-    parser.add_argument("--instance", help="Path to instance file (.xmi/.xml/.iso20022)")
-    parser.add_argument("--dump-metamodel", action="store_true", help="Print metamodel summary")
-    parser.add_argument("--dump-metamodel-json", help="Write metamodel summary to JSON")
-    parser.add_argument("--export-metamodel-mermaid", help="Export metamodel graph to Mermaid")
-    parser.add_argument("--export-metamodel-plantuml", help="Export metamodel graph to PlantUML")
-    parser.add_argument("--export-metamodel-gml", help="Export metamodel graph to GML")
-    parser.add_argument(
+# Command-line flags as (flag, add_argument keyword arguments), in help order.
+_ARG_SPECS = (
+    ("--ecore", {"required": True, "help": "Path to .ecore file"}),
+    ("--instance", {"help": "Path to instance file (.xmi/.xml/.iso20022)"}),
+    ("--dump-metamodel", {"action": "store_true", "help": "Print metamodel summary"}),
+    ("--dump-metamodel-json", {"help": "Write metamodel summary to JSON"}),
+    ("--export-metamodel-mermaid", {"help": "Export metamodel graph to Mermaid"}),
+    ("--export-metamodel-plantuml", {"help": "Export metamodel graph to PlantUML"}),
+    ("--export-metamodel-gml", {"help": "Export metamodel graph to GML"}),
+    (
         "--metamodel-include-references",
-        action="store_true",
-        help="Include non-containment references in metamodel graphs",
-    )
-    parser.add_argument("--dump-model", action="store_true", help="Print model summary")
-    parser.add_argument("--dump-model-json", help="Write model summary to JSON")
-    parser.add_argument("--dump-instances", action="store_true", help="Print instance summary")
-    parser.add_argument("--dump-instances-json", help="Write instances grouped by class to JSON")
-    parser.add_argument("--dump-instances-filter", help="Filter expression for instance JSON dump")
-    parser.add_argument("--export-mermaid", help="Export filtered instance graph to Mermaid")
-    parser.add_argument("--export-plantuml", help="Export filtered instance graph to PlantUML")
-    parser.add_argument("--export-gml", help="Export filtered instance graph to GML")
-    parser.add_argument("--export-instance", help="Export filtered instance resource to XMI")
-    parser.add_argument("--include-classes", help="Comma-separated EClass names to include")
-    parser.add_argument("--exclude-classes", help="Comma-separated EClass names to exclude")
-    parser.add_argument(
+        {"action": "store_true", "help": "Include non-containment references in metamodel graphs"},
+    ),
+    ("--dump-model", {"action": "store_true", "help": "Print model summary"}),
+    ("--dump-model-json", {"help": "Write model summary to JSON"}),
+    ("--dump-instances", {"action": "store_true", "help": "Print instance summary"}),
+    ("--dump-instances-json", {"help": "Write instances grouped by class to JSON"}),
+    ("--dump-instances-filter", {"help": "Filter expression for instance JSON dump"}),
+    ("--export-mermaid", {"help": "Export filtered instance graph to Mermaid"}),
+    ("--export-plantuml", {"help": "Export filtered instance graph to PlantUML"}),
+    ("--export-gml", {"help": "Export filtered instance graph to GML"}),
+    ("--export-instance", {"help": "Export filtered instance resource to XMI"}),
+    ("--include-classes", {"type": _csv_set, "help": "Comma-separated EClass names to include"}),
+    ("--exclude-classes", {"type": _csv_set, "help": "Comma-separated EClass names to exclude"}),
+    (
         "--prune-include-supertypes",
-        action="store_true",
-        help="Include supertypes of included classes during pruning",
-    )
-    parser.add_argument(
+        {"action": "store_true", "help": "Include supertypes of included classes during pruning"},
+    ),
+    (
         "--prune-strip-refs",
-        action="store_true",
-        help="Remove references to pruned classes in exported instance",
-    )
-    parser.add_argument(
+        {
+            "action": "store_true",
+            "help": "Remove references to pruned classes in exported instance",
+        },
+    ),
+    (
         "--prune-serialize-defaults",
-        action="store_true",
-        help="Serialize default attribute values in pruned instance output",
-    )
-    parser.add_argument(
+        {
+            "action": "store_true",
+            "help": "Serialize default attribute values in pruned instance output",
+        },
+    ),
+    (
         "--prune-debug-attrs",
-        action="store_true",
-        help="Log sample attribute values during pruning",
-    )
-    parser.add_argument(
+        {"action": "store_true", "help": "Log sample attribute values during pruning"},
+    ),
+    (
         "--prune-debug-defaults",
-        action="store_true",
-        help="Log default enum resolution during pruning",
-    )
-    parser.add_argument(
+        {"action": "store_true", "help": "Log default enum resolution during pruning"},
+    ),
+    (
         "--prune-no-containers",
-        action="store_true",
-        help="Do not include containment ancestors when pruning",
-    )
-    parser.add_argument(
+        {"action": "store_true", "help": "Do not include containment ancestors when pruning"},
+    ),
+    (
         "--prune-dry-run",
-        action="store_true",
-        help="Preview pruning results without writing an instance file",
-    )
-    parser.add_argument(
-        "--prune-dry-run-json",
-        help="Write pruning dry-run summary to JSON",
-    )
-    parser.add_argument("--neighbors-from", help="Seed filter expression for neighborhood expansion")
-    parser.add_argument("--neighbors", type=int, help="Neighborhood hops for expansion")
-    parser.add_argument("--export-json", help="Export loaded objects to JSON")
-    parser.add_argument("--export-edges", help="Export edges to CSV")
-    parser.add_argument("--export-paths", help="Export expansion paths to text")
-    parser.add_argument("--export-path-ids", help="Export expansion path IDs to text")
-    parser.add_argument("--filter-expr", help="Filter expression for exported objects")
-    parser.add_argument(
+        {
+            "action": "store_true",
+            "help": "Preview pruning results without writing an instance file",
+        },
+    ),
+    ("--prune-dry-run-json", {"help": "Write pruning dry-run summary to JSON"}),
+    ("--neighbors-from", {"help": "Seed filter expression for neighborhood expansion"}),
+    ("--neighbors", {"type": int, "help": "Neighborhood hops for expansion"}),
+    ("--export-json", {"help": "Export loaded objects to JSON"}),
+    (
+        "--json-skip-defaults",
+        {
+            "action": "store_true",
+            "help": "Omit attributes that were never explicitly set from instance JSON",
+        },
+    ),
+    ("--export-edges", {"help": "Export edges to CSV"}),
+    ("--export-paths", {"help": "Export expansion paths to text"}),
+    ("--export-path-ids", {"help": "Export expansion path IDs to text"}),
+    ("--filter-expr", {"help": "Filter expression for exported objects"}),
+    (
         "--expand-from",
-        help="Expansion start expression (adds reachable objects via references)",
-    )
-    parser.add_argument(
+        {"help": "Expansion start expression (adds reachable objects via references)"},
+    ),
+    (
         "--expand-depth",
-        type=int,
-        help="Expansion depth (0=start only, -1=unbounded). Default: 1",
-        default=1,
-    )
-    parser.add_argument(
+        {
+            "type": int,
+            "default": 1,
+            "help": "Expansion depth (0=start only, -1=unbounded). Default: 1",
+        },
+    ),
+    (
         "--expand-classes",
-        help="Comma-separated EClass names allowed during expansion",
-    )
-    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+        {"type": _csv_set, "help": "Comma-separated EClass names allowed during expansion"},
+    ),
+    (
+        "--export-workers",
+        {
+            "type": int,
+            "default": 1,
+            "help": "Threads for writing instance exports (1=one after another). Default: 1",
+        },
+    ),
+    ("--no-cache", {"action": "store_true", "help": "Do not read or write the metamodel cache"}),
+    ("--verbose", {"action": "store_true", "help": "Verbose logging"}),
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Read EMF .ecore metamodels and instance files.")
+    for flag, options in _ARG_SPECS:
+        parser.add_argument(flag, **options)
     return parser
 
 
+@lru_cache(maxsize=1)
+def _parser() -> argparse.ArgumentParser:
+    # parse_args leaves the parser untouched, so repeated main() calls share one.
+    return build_parser()
+
+
 def main(argv: list[str] | None = None) -> int:
-    parser = build_parser()
+    parser = _parser()
     try:
         args = parser.parse_args(argv)
         _configure_logging(args.verbose)
-        logging.info("Parameters:")
-        for name, value in vars(args).items():
-            logging.info("%s: %s", name, value)
+        LOGGER.debug("Parameters: %s", vars(args))
 
+        needs_instance = any(getattr(args, flag) for flag in _INSTANCE_FLAGS)
+        needs_packages = needs_instance or any(getattr(args, flag) for flag in _PACKAGE_FLAGS)
+
+        # Summary-only runs are served from the cached metamodel index and
+        # skip parsing the .ecore when the cache is warm.
+        index = None
         try:
-            rset, packages = load_metamodel(args.ecore)
+            if needs_packages:
+                rset, packages = load_metamodel(args.ecore)
+            else:
+                index = load_metamodel_index(args.ecore, use_cache=not args.no_cache)
         except Exception as exc:  # noqa: BLE001
-            logging.error("Failed to load metamodel: %s", exc)
+            LOGGER.error("Failed to load metamodel: %s", exc)
             return 2
-        stats = metamodel_stats(packages)
-        logging.info(
-            "Metamodel stats: packages=%s classes=%s attributes=%s references=%s",
-            stats["packages"],
-            stats["classes"],
-            stats["attributes"],
-            stats["references"],
-        )
+        # Stats walk every class; only compute them when they will be logged.
+        if LOGGER.isEnabledFor(logging.INFO):
+            stats = metamodel_stats(packages) if index is None else metamodel_index_stats(index)
+            LOGGER.info(
+                "Metamodel stats: packages=%s classes=%s attributes=%s references=%s",
+                stats["packages"],
+                stats["classes"],
+                stats["attributes"],
+                stats["references"],
+            )
 
         if args.dump_metamodel:
-            summary = summarize_metamodel(packages)
-            logging.info("Metamodel classes: %s", count_metamodel_classes(packages))
+            if index is None:
+                summary = summarize_metamodel(packages)
+                class_count = count_metamodel_classes(packages)
+            else:
+                summary = summarize_metamodel_index(index)
+                class_count = sum(len(pkg["classes"]) for pkg in index["packages"])
+            LOGGER.info("Metamodel classes: %s", class_count)
             print(summary)
         if args.dump_metamodel_json:
-            payload = metamodel_dump(packages)
-            with open(args.dump_metamodel_json, "w", encoding="utf-8") as handle:
-                json.dump(payload, handle, indent=2)
-            logging.info("Wrote metamodel JSON: %s", args.dump_metamodel_json)
+            payload = metamodel_dump(packages) if index is None else index
+            _write_json(payload, args.dump_metamodel_json)
+            LOGGER.info("Wrote metamodel JSON: %s", args.dump_metamodel_json)
         if args.export_metamodel_mermaid:
+            from .export import export_metamodel_mermaid
+
             stats = export_metamodel_mermaid(
                 packages,
                 args.export_metamodel_mermaid,
                 include_references=args.metamodel_include_references,
             )
-            logging.info(
+            LOGGER.info(
                 "Wrote metamodel Mermaid: %s (nodes=%s edges=%s)",
                 args.export_metamodel_mermaid,
                 stats["nodes"],
                 stats["edges"],
             )
         if args.export_metamodel_plantuml:
+            from .export import export_metamodel_plantuml
+
             stats = export_metamodel_plantuml(
                 packages,
                 args.export_metamodel_plantuml,
                 include_references=args.metamodel_include_references,
             )
-            logging.info(
+            LOGGER.info(
                 "Wrote metamodel PlantUML: %s (nodes=%s edges=%s)",
                 args.export_metamodel_plantuml,
                 stats["nodes"],
                 stats["edges"],
             )
         if args.export_metamodel_gml:
+            from .export import export_metamodel_gml
+
             stats = export_metamodel_gml(
                 packages,
                 args.export_metamodel_gml,
                 include_references=args.metamodel_include_references,
             )
-            logging.info(
+            LOGGER.info(
                 "Wrote metamodel GML: %s (nodes=%s edges=%s)",
                 args.export_metamodel_gml,
                 stats["nodes"],
                 stats["edges"],
             )
 
-        needs_instance = (
-            args.dump_instances
-            or args.dump_model
-            or args.dump_model_json
-            or args.dump_instances_json
-            or args.export_json
-            or args.export_edges
-            or args.export_paths
-            or args.export_path_ids
-            or args.export_mermaid
-            or args.export_plantuml
-            or args.export_gml
-            or args.export_instance
-        )
         if needs_instance or args.prune_dry_run or args.prune_dry_run_json:
+            from .export import (
+                ExportPlan,
+                build_object_graph,
+                export_filtered_instance,
+                export_instances_by_class,
+                model_dump,
+                preview_filtered_instance,
+                preview_prune_metamodel,
+                run_export_plan,
+                select_prune,
+                summarize_model,
+            )
+            from .query import compile_filter
+
             if not args.instance and needs_instance:
-                logging.error("Instance file required for instance operations")
+                LOGGER.error("Instance file required for instance operations")
                 return 2
             try:
                 instance_resource = load_instance(args.instance, rset) if args.instance else None
             except Exception as exc:  # noqa: BLE001
-                logging.error("Failed to load instance: %s", exc)
+                LOGGER.error("Failed to load instance: %s", exc)
                 return 2
             if instance_resource is not None:
-                instats = instance_stats([instance_resource])
-                logging.info("Instance stats: roots=%s", instats["roots"])
+                if LOGGER.isEnabledFor(logging.INFO):
+                    instats = instance_stats([instance_resource])
+                    LOGGER.info("Instance stats: roots=%s", instats["roots"])
                 roots = list(instance_resource.contents)
             else:
                 roots = []
+            wants_plan = any(getattr(args, flag) for _, flag, _ in _PLAN_EXPORTS)
+            # Only expressions whose output was requested are compiled, so a bad
+            # expression for an unused option does not fail the run.
+            filter_pred = expand_pred = neighbor_pred = instances_pred = None
+            try:
+                if wants_plan:
+                    filter_pred = compile_filter(args.filter_expr)
+                    expand_pred = compile_filter(args.expand_from)
+                    neighbor_pred = compile_filter(args.neighbors_from)
+                if args.dump_instances_json:
+                    instances_pred = compile_filter(args.dump_instances_filter)
+            except ValueError as exc:
+                LOGGER.error("Invalid filter expression: %s", exc)
+                return 2
+            # --dump-model, --dump-instances-json and the export plan all start
+            # from the same containment walk; run it once for all of them.
+            graph = None
+            if args.dump_model or args.dump_instances_json or wants_plan:
+                graph = build_object_graph(roots, record_edges=bool(args.export_edges))
             if args.dump_instances:
                 print(summarize_instances([instance_resource]))
             if args.dump_model:
-                print(summarize_model(roots))
+                print(summarize_model(roots, graph=graph))
             if args.dump_model_json:
                 payload = model_dump(roots)
-                with open(args.dump_model_json, "w", encoding="utf-8") as handle:
-                    json.dump(payload, handle, indent=2)
-                logging.info("Wrote model JSON: %s", args.dump_model_json)
+                _write_json(payload, args.dump_model_json)
+                LOGGER.info("Wrote model JSON: %s", args.dump_model_json)
             if args.dump_instances_json:
-                try:
-                    payload = dump_instances_by_class(roots, filter_expr=args.dump_instances_filter)
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
-                    return 2
-                with open(args.dump_instances_json, "w", encoding="utf-8") as handle:
-                    json.dump(payload, handle, indent=2)
-                logging.info("Wrote instances JSON: %s", args.dump_instances_json)
-            expand_depth = args.expand_depth if args.expand_from else None
-            expand_classes = None
-            if args.expand_classes:
-                expand_classes = {name.strip() for name in args.expand_classes.split(",") if name.strip()}
-            neighbor_expr = args.neighbors_from
-            neighbor_hops = args.neighbors if args.neighbors is not None else None
-            include_classes = None
-            exclude_classes = None
-            if args.include_classes:
-                include_classes = {name.strip() for name in args.include_classes.split(",") if name.strip()}
-            if args.exclude_classes:
-                exclude_classes = {name.strip() for name in args.exclude_classes.split(",") if name.strip()}
+                count = export_instances_by_class(
+                    roots,
+                    args.dump_instances_json,
+                    filter_expr=instances_pred,
+                    graph=graph,
+                    skip_defaults=args.json_skip_defaults,
+                )
+                LOGGER.info("Wrote instances JSON: %s (objects=%s)", args.dump_instances_json, count)
+            # Class lists are parsed into interned frozensets by argparse.
+            include_classes = args.include_classes
+            exclude_classes = args.exclude_classes
+            prune_selection = None
             if args.prune_dry_run or args.prune_dry_run_json:
                 if instance_resource is None:
                     stats = preview_prune_metamodel(
@@ -307,46 +470,44 @@ def main(argv: list[str] | None = None) -> int:
                         include_supertypes=args.prune_include_supertypes,
                     )
                 else:
-                    stats = export_filtered_instance(
+                    # Kept for --export-instance, which prunes with the same options.
+                    prune_selection = select_prune(
                         instance_resource,
-                        args.export_instance or "",
                         include_classes=include_classes,
                         exclude_classes=exclude_classes,
-                        dry_run=True,
                         include_supertypes=args.prune_include_supertypes,
                         include_containers=not args.prune_no_containers,
                     )
+                    stats = preview_filtered_instance(instance_resource, selection=prune_selection)
                 _log_prune_summary(stats)
                 if args.prune_dry_run_json:
-                    with open(args.prune_dry_run_json, "w", encoding="utf-8") as handle:
-                        json.dump(stats, handle, indent=2)
-                    logging.info("Wrote prune dry-run JSON: %s", args.prune_dry_run_json)
-            if args.export_mermaid:
-                try:
-                    stats = export_mermaid(
-                        roots,
-                        args.export_mermaid,
-                        filter_expr=args.filter_expr,
-                        neighbor_expr=neighbor_expr,
-                        neighbor_hops=neighbor_hops,
-                    )
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
+                    _write_json(stats, args.prune_dry_run_json)
+                    LOGGER.info("Wrote prune dry-run JSON: %s", args.prune_dry_run_json)
+            if wants_plan:
+                expand_depth = args.expand_depth if args.expand_from else None
+                expand_classes = args.expand_classes
+                neighbor_hops = args.neighbors if args.neighbors is not None else None
+                if (args.export_paths or args.export_path_ids) and not args.expand_from:
+                    flag = "export-paths" if args.export_paths else "export-path-ids"
+                    LOGGER.error("%s requires --expand-from", flag)
                     return 2
-                logging.info(
-                    "Wrote Mermaid: %s (nodes=%s edges=%s)",
-                    args.export_mermaid,
-                    stats["nodes"],
-                    stats["edges"],
+                plan = ExportPlan(**{key: getattr(args, flag) for key, flag, _ in _PLAN_EXPORTS})
+                results = run_export_plan(
+                    roots,
+                    plan,
+                    filter_expr=filter_pred,
+                    expand_expr=expand_pred,
+                    expand_depth=expand_depth,
+                    expand_classes=expand_classes,
+                    neighbor_expr=neighbor_pred,
+                    neighbor_hops=neighbor_hops,
+                    graph=graph,
+                    skip_defaults=args.json_skip_defaults,
+                    max_workers=args.export_workers,
                 )
-                if "seed_nodes" in stats:
-                    logging.info(
-                        "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
-                        stats["seed_nodes"],
-                        stats["nodes_seen"],
-                        stats["edges_traversed"],
-                        stats["max_hops"],
-                    )
+                for key, flag, log_result in _PLAN_EXPORTS:
+                    if key in results:
+                        log_result(getattr(args, flag), results[key])
             if args.export_instance:
                 stats = export_filtered_instance(
                     instance_resource,
@@ -359,214 +520,14 @@ def main(argv: list[str] | None = None) -> int:
                     include_containers=not args.prune_no_containers,
                     debug_attrs=args.prune_debug_attrs,
                     debug_defaults=args.prune_debug_defaults,
+                    selection=prune_selection,
                 )
-                logging.info(
+                LOGGER.info(
                     "Wrote instance XMI: %s (selected=%s roots=%s)",
                     args.export_instance,
                     stats["selected"],
                     stats["roots"],
                 )
-            if args.export_plantuml:
-                try:
-                    stats = export_plantuml(
-                        roots,
-                        args.export_plantuml,
-                        filter_expr=args.filter_expr,
-                        neighbor_expr=neighbor_expr,
-                        neighbor_hops=neighbor_hops,
-                    )
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
-                    return 2
-                logging.info(
-                    "Wrote PlantUML: %s (nodes=%s edges=%s)",
-                    args.export_plantuml,
-                    stats["nodes"],
-                    stats["edges"],
-                )
-                if "seed_nodes" in stats:
-                    logging.info(
-                        "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
-                        stats["seed_nodes"],
-                        stats["nodes_seen"],
-                        stats["edges_traversed"],
-                        stats["max_hops"],
-                    )
-            if args.export_gml:
-                try:
-                    stats = export_gml(
-                        roots,
-                        args.export_gml,
-                        filter_expr=args.filter_expr,
-                        neighbor_expr=neighbor_expr,
-                        neighbor_hops=neighbor_hops,
-                    )
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
-                    return 2
-                logging.info(
-                    "Wrote GML: %s (nodes=%s edges=%s)",
-                    args.export_gml,
-                    stats["nodes"],
-                    stats["edges"],
-                )
-                if "seed_nodes" in stats:
-                    logging.info(
-                        "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
-                        stats["seed_nodes"],
-                        stats["nodes_seen"],
-                        stats["edges_traversed"],
-                        stats["max_hops"],
-                    )
-            if args.export_json:
-                try:
-                    entries, metrics = export_json(
-                        roots,
-                        args.export_json,
-                        filter_expr=args.filter_expr,
-                        expand_expr=args.expand_from,
-                        expand_depth=expand_depth,
-                        expand_classes=expand_classes,
-                        neighbor_expr=neighbor_expr,
-                        neighbor_hops=neighbor_hops,
-                    )
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
-                    return 2
-                logging.info("Wrote JSON: %s (objects=%s)", args.export_json, len(entries))
-                if metrics:
-                    if "seed_nodes" in metrics:
-                        logging.info(
-                            "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
-                            metrics["seed_nodes"],
-                            metrics["nodes_seen"],
-                            metrics["edges_traversed"],
-                            metrics["max_hops"],
-                        )
-                    logging.info(
-                        "Expansion metrics: start_nodes=%s nodes_seen=%s edges_traversed=%s loops_detected=%s max_depth=%s",
-                        metrics["start_nodes"],
-                        metrics["nodes_seen"],
-                        metrics["edges_traversed"],
-                        metrics["loops_detected"],
-                        metrics["max_depth"],
-                    )
-            if args.export_edges:
-                try:
-                    edges, metrics = export_edges(
-                        roots,
-                        args.export_edges,
-                        filter_expr=args.filter_expr,
-                        expand_expr=args.expand_from,
-                        expand_depth=expand_depth,
-                        expand_classes=expand_classes,
-                        neighbor_expr=neighbor_expr,
-                        neighbor_hops=neighbor_hops,
-                    )
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
-                    return 2
-                logging.info("Wrote edges: %s (edges=%s)", args.export_edges, len(edges))
-                if metrics:
-                    if "seed_nodes" in metrics:
-                        logging.info(
-                            "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
-                            metrics["seed_nodes"],
-                            metrics["nodes_seen"],
-                            metrics["edges_traversed"],
-                            metrics["max_hops"],
-                        )
-                    logging.info(
-                        "Expansion metrics: start_nodes=%s nodes_seen=%s edges_traversed=%s loops_detected=%s max_depth=%s",
-                        metrics["start_nodes"],
-                        metrics["nodes_seen"],
-                        metrics["edges_traversed"],
-                        metrics["loops_detected"],
-                        metrics["max_depth"],
-                    )
-            if args.export_paths:
-                if not args.expand_from:
-                    logging.error("export-paths requires --expand-from")
-                    return 2
-                try:
-                    paths, metrics = export_paths(
-                        roots,
-                        args.export_paths,
-                        filter_expr=args.filter_expr,
-                        expand_expr=args.expand_from,
-                        expand_depth=expand_depth,
-                        expand_classes=expand_classes,
-                        neighbor_expr=neighbor_expr,
-                        neighbor_hops=neighbor_hops,
-                    )
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
-                    return 2
-                logging.info("Wrote paths: %s (paths=%s)", args.export_paths, len(paths))
-                if paths:
-                    preview = ", ".join(paths[:10])
-                    logging.info("Expansion paths preview (max 10): %s", preview)
-                if metrics:
-                    if "seed_nodes" in metrics:
-                        logging.info(
-                            "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
-                            metrics["seed_nodes"],
-                            metrics["nodes_seen"],
-                            metrics["edges_traversed"],
-                            metrics["max_hops"],
-                        )
-                    logging.info(
-                        "Expansion metrics: start_nodes=%s nodes_seen=%s edges_traversed=%s loops_detected=%s max_depth=%s",
-                        metrics["start_nodes"],
-                        metrics["nodes_seen"],
-                        metrics["edges_traversed"],
-                        metrics["loops_detected"],
-                        metrics["max_depth"],
-                    )
-                    if metrics["start_nodes"] == 0:
-                        logging.warning("No expansion start nodes matched the expression")
-            if args.export_path_ids:
-                if not args.expand_from:
-                    logging.error("export-path-ids requires --expand-from")
-                    return 2
-                try:
-                    pairs, metrics = export_path_ids(
-                        roots,
-                        args.export_path_ids,
-                        filter_expr=args.filter_expr,
-                        expand_expr=args.expand_from,
-                        expand_depth=expand_depth,
-                        expand_classes=expand_classes,
-                        neighbor_expr=neighbor_expr,
-                        neighbor_hops=neighbor_hops,
-                    )
-                except ValueError as exc:
-                    logging.error("Invalid filter expression: %s", exc)
-                    return 2
-                logging.info("Wrote path IDs: %s (rows=%s)", args.export_path_ids, len(pairs))
-                if pairs:
-                    preview = ", ".join([path for _, path in pairs[:10]])
-                    logging.info("Path IDs preview (max 10): %s", preview)
-                if metrics:
-                    if "seed_nodes" in metrics:
-                        logging.info(
-                            "Neighbor metrics: seed_nodes=%s nodes_seen=%s edges_traversed=%s max_hops=%s",
-                            metrics["seed_nodes"],
-                            metrics["nodes_seen"],
-                            metrics["edges_traversed"],
-                            metrics["max_hops"],
-                        )
-                    logging.info(
-                        "Expansion metrics: start_nodes=%s nodes_seen=%s edges_traversed=%s loops_detected=%s max_depth=%s",
-                        metrics["start_nodes"],
-                        metrics["nodes_seen"],
-                        metrics["edges_traversed"],
-                        metrics["loops_detected"],
-                        metrics["max_depth"],
-                    )
-                    if metrics["start_nodes"] == 0:
-                        logging.warning("No expansion start nodes matched the expression")
-
         return 0
     except KeyboardInterrupt:
         print("Stopped by user.")
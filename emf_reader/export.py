@@ -2,35 +2,357 @@ from __future__ import annotations
 
 import csv
 import json
+import math
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from functools import partial
+from typing import AbstractSet, BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple
+from weakref import WeakKeyDictionary
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 from pyecore.ecore import EObject
 from pyecore.resources import URI
 from pyecore.resources.xmi import XMIOptions, XMIResource
 
-from .query import build_context, build_predicate
-from .loader import _configure_resource_set
+from .query import FilterExpr, Predicate, build_context, class_test_applies, compile_filter
+from .loader import _configure_resource_set, class_index
 
 
-@dataclass
+@dataclass(init=False)
 class ObjectInfo:
+    """One object of ``build_object_graph``; slotted to keep large graphs compact.
+
+    The containment path is stored as this object's ``segment`` below its
+    ``parent`` and joined into the ``path`` slot on first read, so walks that
+    never read it skip building one string per object. The dataclass fields
+    are still ``(obj, obj_id, path)``: ``fields()``, ``asdict()``,
+    ``replace()``, equality and repr all see the joined path, and
+    ``ObjectInfo(obj, obj_id, path=...)`` builds a parentless info.
+    """
+
+    __slots__ = ("obj", "obj_id", "path", "segment", "parent")
+
     obj: EObject
     obj_id: str
     path: str
 
+    def __init__(
+        self,
+        obj: EObject,
+        obj_id: str,
+        segment: str | None = None,
+        parent: ObjectInfo | None = None,
+        *,
+        path: str | None = None,
+    ) -> None:
+        if path is not None:
+            if segment is not None or parent is not None:
+                raise TypeError("ObjectInfo() takes either path or segment/parent")
+            self.path = path
+            segment = path
+        elif segment is None:
+            raise TypeError("ObjectInfo() missing required argument: 'segment' or 'path'")
+        self.obj = obj
+        self.obj_id = obj_id
+        self.segment = segment
+        self.parent = parent
+
+    def __getattr__(self, name: str) -> str:
+        # Only called for empty slots, i.e. a ``path`` that was never joined.
+        if name != "path":
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        chain: List[ObjectInfo] = [self]
+        info = self.parent
+        path = ""
+        while info is not None:
+            try:
+                path = _joined_path(info)
+                break
+            except AttributeError:
+                chain.append(info)
+                info = info.parent
+        for info in reversed(chain):
+            path = info.path = path + info.segment
+        return path
+
+
+# Reads the ``path`` slot without falling back to ``ObjectInfo.__getattr__``.
+_joined_path = ObjectInfo.path.__get__
+
+
+class EdgeTable(Sequence):
+    """Containment edges stored column-wise as ``array('i')`` indices.
+
+    ``src``/``dst`` index into ``objects`` and ``feature`` into ``features``,
+    so each edge costs three machine ints instead of a dict. Indexing or
+    iterating yields the row dicts ``build_object_graph`` has always returned.
+    """
+
+    def __init__(self, objects: List[ObjectInfo]) -> None:
+        self.objects = objects
+        self.features: List[str] = []
+        self._feature_index: Dict[str, int] = {}
+        self.src = array("i")
+        self.dst = array("i")
+        self.feature = array("i")
+
+    def append(self, src: int, feature: str, dst: int) -> None:
+        idx = self._feature_index.get(feature)
+        if idx is None:
+            idx = self._feature_index[feature] = len(self.features)
+            self.features.append(sys.intern(feature))
+        self.src.append(src)
+        self.feature.append(idx)
+        self.dst.append(dst)
+
+    def rows(self) -> Iterator[tuple[ObjectInfo, str, ObjectInfo]]:
+        objects = self.objects
+        features = self.features
+        for src, feature, dst in zip(self.src, self.feature, self.dst):
+            yield objects[src], features[feature], objects[dst]
+
+    def _row(self, src: ObjectInfo, feature: str, dst: ObjectInfo) -> Dict[str, str | bool]:
+        return {
+            "src_id": src.obj_id,
+            "src_class": _class_name(src.obj),
+            "feature": feature,
+            "dst_id": dst.obj_id,
+            "dst_class": _class_name(dst.obj),
+            "containment": True,
+        }
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._row(
+            self.objects[self.src[index]],
+            self.features[self.feature[index]],
+            self.objects[self.dst[index]],
+        )
+
+    def __iter__(self) -> Iterator[Dict[str, str | bool]]:
+        for row in self.rows():
+            yield self._row(*row)
+
+
+# Per-EClass feature tuples and interned names; every instance of a class
+# shares one reflective walk. Weak keys let the entries go away with their
+# metamodel.
+_FEATURE_CACHE: WeakKeyDictionary[object, Dict[str, tuple]] = WeakKeyDictionary()
+
+
+def _class_features(eclass) -> Dict[str, tuple]:
+    features = _FEATURE_CACHE.get(eclass)
+    if features is None:
+        features = {}
+        for name in ("eAllAttributes", "eAllReferences"):
+            attr = getattr(eclass, name, ())
+            features[name] = tuple(attr() if callable(attr) else attr)
+        features["containment"] = tuple(
+            ref for ref in features["eAllReferences"] if getattr(ref, "containment", False)
+        )
+        features["references"] = tuple(
+            ref for ref in features["eAllReferences"] if not getattr(ref, "containment", False)
+        )
+        # Interned feature names, index-aligned with the tuples above. Reading
+        # ``getattr(obj, name)`` is what ``obj.eGet(feature)`` does after
+        # resolving ``feature.name`` through its descriptor.
+        for key, names_key in (
+            ("eAllAttributes", "attribute_names"),
+            ("eAllReferences", "all_reference_names"),
+            ("containment", "containment_names"),
+            ("references", "reference_names"),
+        ):
+            features[names_key] = tuple(sys.intern(feature.name) for feature in features[key])
+        for key, many_key in (
+            ("eAllReferences", "all_reference_many"),
+            ("containment", "containment_many"),
+            ("references", "reference_many"),
+        ):
+            features[many_key] = tuple(bool(ref.many) for ref in features[key])
+        features["attribute_serializers"] = tuple(
+            _attribute_serializer(attr) for attr in features["eAllAttributes"]
+        )
+        features["name"] = sys.intern(getattr(eclass, "name", None) or "")
+        _FEATURE_CACHE[eclass] = features
+    return features
+
+
+# Python types pyecore stores as-is for EString/EInt/EBoolean/EDouble and friends.
+_PLAIN_TYPES = (str, int, float, bool)
+
+
+def _attribute_serializer(attr) -> Callable[[object], object] | None:
+    """Pick how ``_attribute_values`` converts ``attr``'s value, once per class.
+
+    ``None`` means the value is already JSON-ready and is used as-is.
+    """
+    python_type = getattr(getattr(attr, "eType", None), "eType", None)
+    plain = python_type in _PLAIN_TYPES
+    if not attr.many:
+        return None if plain else _json_safe
+    if plain:
+        return lambda values: list(values) if values is not None else []
+    return lambda values: [_json_safe(v) for v in values] if values is not None else []
+
 
 def _all_features(obj: EObject, name: str):
-    attr = getattr(obj.eClass, name, [])
-    return attr() if callable(attr) else list(attr)
+    features = _class_features(obj.eClass)
+    cached = features.get(name)
+    if cached is None:
+        attr = getattr(obj.eClass, name, ())
+        cached = features[name] = tuple(attr() if callable(attr) else attr)
+    return cached
+
+
+def _class_name(obj: EObject) -> str:
+    """``obj.eClass.name``, interned and shared by every instance of the class."""
+    return _class_features(obj.eClass)["name"]
+
 
 def _containment_features(obj: EObject):
-    return [ref for ref in _all_features(obj, "eAllReferences") if getattr(ref, "containment", False)]
+    return _class_features(obj.eClass)["containment"]
+
+
+def class_references(eclass) -> tuple:
+    """All references of ``eclass``, containment included; cached per class."""
+    return _class_features(eclass)["eAllReferences"]
+
+
+def class_containments(eclass) -> tuple:
+    """The containment references of ``eclass``; cached per class."""
+    return _class_features(eclass)["containment"]
+
+
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _open_output(path: str, binary: bool = False, newline: str | None = None):
+    """Open ``path`` for writing behind a 1 MiB buffer to batch small writes."""
+    if binary:
+        return open(path, "wb", buffering=_WRITE_BUFFER_SIZE)
+    return open(path, "w", encoding="utf-8", newline=newline, buffering=_WRITE_BUFFER_SIZE)
+
+
+# OPT_NON_STR_KEYS matches the stdlib, which stringifies int/float/bool/None keys.
+_ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _json_default(value: object) -> object:
+    """Coerce values neither encoder handles natively (enum literals, sets, ...)."""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    name = getattr(value, "name", None)
+    if isinstance(name, str):
+        return name
+    return str(value)
+
+
+def _finite_floats(value: object) -> object:
+    """Replace NaN and infinite floats in ``value`` with ``None``, as orjson does."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite_floats(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_floats(item) for item in value]
+    return value
+
+
+def _json_bytes(value: object) -> bytes:
+    """Encode ``value`` as two-space-indented UTF-8 JSON.
+
+    Both encoders produce the same bytes: non-ASCII text is written as is and
+    NaN/Infinity become ``null``. Values orjson rejects (integers beyond 64
+    bits) are encoded by the stdlib instead.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+    try:
+        text = json.dumps(
+            value, indent=2, ensure_ascii=False, allow_nan=False, default=_json_default
+        )
+    except ValueError:
+        text = json.dumps(
+            _finite_floats(value), indent=2, ensure_ascii=False, default=_json_default
+        )
+    return text.encode("utf-8")
+
+
+def _write_json_array(handle: BinaryIO, items: Iterable[object], depth: int = 0) -> int:
+    """Write ``items`` as an indented JSON array one element at a time."""
+    indent = b"  " * depth
+    item_indent = indent + b"  "
+    newline = b"\n" + item_indent
+    # One write per element; the output's 1 MiB buffer batches the syscalls.
+    write = handle.write
+    separator = b"[" + newline
+    next_separator = b"," + newline
+    count = 0
+    for item in items:
+        write(separator + _json_bytes(item).replace(b"\n", newline))
+        separator = next_separator
+        count += 1
+    write(b"\n" + indent + b"]" if count else b"[]")
+    return count
+
+
+def _write_json_object(
+    handle: BinaryIO, pairs: Iterable[Tuple[str, object]], depth: int = 0
+) -> None:
+    """Write ``pairs`` as an indented JSON object, streaming list values."""
+    indent = b"  " * depth
+    item_indent = indent + b"  "
+    newline = b"\n" + item_indent
+    write = handle.write
+    separator = b"{" + newline
+    first = True
+    for key, value in pairs:
+        write(separator + _json_bytes(key) + b": ")
+        if isinstance(value, list):
+            _write_json_array(handle, value, depth + 1)
+        else:
+            write(_json_bytes(value).replace(b"\n", newline))
+        separator = b"," + newline
+        first = False
+    write(b"{}" if first else b"\n" + indent + b"}")
+
+
+def write_json(payload: Dict[str, object], output_path: str) -> None:
+    """Write ``payload`` to ``output_path`` as JSON indented by two spaces.
+
+    Top-level entries, and the items of top-level lists, are encoded one at a
+    time, so the full document text is never held in memory.
+    """
+    with _open_output(output_path, binary=True) as handle:
+        _write_json_object(handle, payload.items())
+
+
+# Exact types returned unchanged by ``_json_safe``: one set probe on
+# ``type(value)`` covers the common values before any isinstance check.
+_JSON_SAFE_TYPES = frozenset((*_PLAIN_TYPES, type(None)))
+
 
 def _json_safe(value: object) -> object:
-    if value is None:
-        return None
-    if isinstance(value, (str, int, float, bool)):
+    if type(value) in _JSON_SAFE_TYPES:
+        return value
+    if isinstance(value, _PLAIN_TYPES):
         return value
     if isinstance(value, bytes):
         return value.decode("utf-8", errors="replace")
@@ -42,63 +364,73 @@ def _json_safe(value: object) -> object:
     return str(value)
 
 
-def build_object_graph(roots: Iterable[EObject]) -> Tuple[List[ObjectInfo], List[Dict[str, str | bool]]]:
-    seen: Dict[EObject, ObjectInfo] = {}
-    edges: List[Dict[str, str | bool]] = []
+# "[0]".."[1023]" path suffixes, so most child paths skip int formatting.
+_INDEX_SUFFIXES = tuple(f"[{idx}]" for idx in range(1024))
 
-    def ensure(obj: EObject, path: str) -> ObjectInfo:
-        if obj in seen:
-            return seen[obj]
-        obj_id = f"o{len(seen) + 1}"
-        info = ObjectInfo(obj=obj, obj_id=obj_id, path=path)
-        seen[obj] = info
-        return info
-
-    def visit(obj: EObject, path: str) -> None:
-        info = ensure(obj, path)
-        for ref in _containment_features(obj):
-            value = obj.eGet(ref)
-            if value is None:
+
+def _containment_children(obj: EObject) -> Iterator[tuple[str, EObject, str]]:
+    """Yield ``(feature, child, path_segment)`` for each contained child of ``obj``."""
+    suffixes = _INDEX_SUFFIXES
+    limit = len(suffixes)
+    features = _class_features(obj.eClass)
+    for name, many in zip(features["containment_names"], features["containment_many"]):
+        value = getattr(obj, name)
+        if value is None:
+            continue
+        prefix = "/" + name
+        # Single-valued containment is the common case; handle it first.
+        if not many:
+            yield name, value, prefix + "[0]"
+            continue
+        for idx, child in enumerate(value):
+            if child is None:
                 continue
-            if ref.many:
-                for idx, child in enumerate(list(value)):
-                    if child is None:
-                        continue
-                    child_path = f"{info.path}/{ref.name}[{idx}]"
-                    child_info = ensure(child, child_path)
-                    edges.append(
-                        {
-                            "src_id": info.obj_id,
-                            "src_class": obj.eClass.name,
-                            "feature": ref.name,
-                            "dst_id": child_info.obj_id,
-                            "dst_class": child.eClass.name,
-                            "containment": True,
-                        }
-                    )
-                    visit(child, child_path)
+            yield name, child, prefix + (suffixes[idx] if idx < limit else f"[{idx}]")
+
+
+ObjectGraph = Tuple[List[ObjectInfo], EdgeTable]
+
+
+def build_object_graph(roots: Iterable[EObject], record_edges: bool = True) -> ObjectGraph:
+    """Walk containment from ``roots`` into ``(objects, containment_edges)``.
+
+    With ``record_edges=False`` the edge table is left empty, for callers
+    that only need the objects and their paths.
+    """
+    seen: Dict[EObject, int] = {}
+    objects: List[ObjectInfo] = []
+    edges = EdgeTable(objects)
+    seen_get = seen.get
+    edges_append = edges.append
+
+    def ensure(obj: EObject, segment: str, parent: ObjectInfo | None) -> int:
+        idx = seen_get(obj)
+        if idx is not None:
+            return idx
+        idx = seen[obj] = len(objects)
+        objects.append(ObjectInfo(obj, f"o{idx + 1}", segment, parent))
+        return idx
+
+    # Depth-first walk with an explicit stack of child iterators; ids and edges
+    # come out in the same preorder as a recursive visit, without its depth limit.
+    # Leaves (classes without containment features) are never pushed.
+    for root_idx, root in enumerate(roots):
+        src = ensure(root, f"/{root.eClass.name}[{root_idx}]", None)
+        stack = [(src, _containment_children(root))]
+        push = stack.append
+        while stack:
+            src, children = stack[-1]
+            parent = objects[src]
+            for feature, child, segment in children:
+                dst = ensure(child, segment, parent)
+                if record_edges:
+                    edges_append(src, feature, dst)
+                if _containment_features(child):
+                    push((dst, _containment_children(child)))
+                    break
             else:
-                child = value
-                if child is None:
-                    continue
-                child_path = f"{info.path}/{ref.name}[0]"
-                child_info = ensure(child, child_path)
-                edges.append(
-                    {
-                        "src_id": info.obj_id,
-                        "src_class": obj.eClass.name,
-                        "feature": ref.name,
-                        "dst_id": child_info.obj_id,
-                        "dst_class": child.eClass.name,
-                        "containment": True,
-                    }
-                )
-                visit(child, child_path)
+                stack.pop()
 
-    for idx, root in enumerate(roots):
-        visit(root, f"/{root.eClass.name}[{idx}]")
-
-    objects = list(seen.values())
     return objects, edges
 
 
@@ -117,6 +449,19 @@ def _iter_values(value: object) -> List[EObject]:
     return []
 
 
+def _iter_many(value: object) -> List[EObject]:
+    """``_iter_values`` for a many-valued reference's collection."""
+    try:
+        return [v for v in value if isinstance(v, EObject)]
+    except Exception:  # noqa: BLE001
+        return []
+
+
+def _iter_single(value: object) -> tuple[EObject, ...]:
+    """``_iter_values`` for a single-valued reference."""
+    return (value,) if isinstance(value, EObject) else ()
+
+
 def _resolve_enum_default(etype, default_literal: str):
     if etype is None:
         return None
@@ -136,82 +481,100 @@ def _resolve_enum_default(etype, default_literal: str):
     return literal
 
 def _collect_metamodel_classes(packages: Iterable[object]) -> List[object]:
-    classes: List[object] = []
-    for pkg in packages:
-        for classifier in getattr(pkg, "eClassifiers", []):
-            if getattr(classifier, "eClass", None) is not None and classifier.eClass.name == "EClass":
-                classes.append(classifier)
-    return classes
+    return [
+        classifier
+        for pkg in packages
+        for classifier in getattr(pkg, "eClassifiers", ())
+        if (meta := getattr(classifier, "eClass", None)) is not None and meta.name == "EClass"
+    ]
 
 
-def export_metamodel_mermaid(
-    packages: Iterable[object],
-    output_path: str,
-    include_references: bool = False,
-) -> dict[str, int]:
-    classes = _collect_metamodel_classes(packages)
-    class_set = set(classes)
-    node_ids = {cls: idx for idx, cls in enumerate(classes)}
-    lines = ["graph TD"]
-    edge_count = 0
+@dataclass
+class _MetamodelTable:
+    """Metamodel classes flattened to ints and strings, one row per class.
 
-    for cls in classes:
-        label = getattr(cls, "name", "")
-        lines.append(f"  n{node_ids[cls]}[\"{label}\"]")
+    ``node_ids[i]`` is the diagram id of ``classes[i]``; ``supers[i]`` holds
+    the node ids of its supertypes and ``refs[i]`` its references to listed
+    classes as ``(target node id, containment, feature name)``.
+    """
+
+    names: List[str]
+    node_ids: List[int]
+    supers: List[List[int]]
+    refs: List[List[tuple[int, bool, str]]]
 
+
+def _metamodel_table(classes: List[object]) -> _MetamodelTable:
+    node_id = dict(zip(classes, range(len(classes))))
+    table = _MetamodelTable([], [], [], [])
     for cls in classes:
-        for super_cls in getattr(cls, "eSuperTypes", []):
-            if super_cls in class_set:
-                lines.append(f"  n{node_ids[super_cls]} --> n{node_ids[cls]}")
-                edge_count += 1
+        table.names.append(getattr(cls, "name", ""))
+        table.node_ids.append(node_id[cls])
+        table.supers.append(
+            [node_id[sup] for sup in getattr(cls, "eSuperTypes", []) if sup in node_id]
+        )
+        refs = []
         for ref in _all_features(cls, "eAllReferences"):
-            target = getattr(ref, "eType", None)
-            if target not in class_set:
-                continue
-            if getattr(ref, "containment", False) or include_references:
-                lines.append(f"  n{node_ids[cls]} --> n{node_ids[target]}")
-                edge_count += 1
+            target = node_id.get(getattr(ref, "eType", None))
+            if target is not None:
+                refs.append((target, bool(getattr(ref, "containment", False)), ref.name))
+        table.refs.append(refs)
+    return table
 
-    with open(output_path, "w", encoding="utf-8") as handle:
-        handle.write("\n".join(lines))
-        handle.write("\n")
 
-    return {"nodes": len(classes), "edges": edge_count}
+def _metamodel_edges(
+    table: _MetamodelTable, include_references: bool
+) -> Iterator[tuple[int, int, bool]]:
+    """Yield ``(source, target, inheritance)`` node-id edges from ``table``.
 
+    Supertype edges run from supertype to subtype; reference edges from owner
+    to the referenced class, containment only unless ``include_references``.
+    """
+    for src, supers, refs in zip(table.node_ids, table.supers, table.refs):
+        for sup in supers:
+            yield sup, src, True
+        for target, containment, _ in refs:
+            if include_references or containment:
+                yield src, target, False
 
-def export_metamodel_plantuml(
+
+def export_metamodel_mermaid(
     packages: Iterable[object],
     output_path: str,
     include_references: bool = False,
 ) -> dict[str, int]:
-    classes = _collect_metamodel_classes(packages)
-    class_set = set(classes)
-    lines = ["@startuml"]
+    table = _metamodel_table(_collect_metamodel_classes(packages))
     edge_count = 0
+    with _open_output(output_path) as handle:
+        write = handle.write
+        write("graph TD\n")
+        for node_id, label in zip(table.node_ids, table.names):
+            write(f"  n{node_id}[\"{label}\"]\n")
+        for src, dst, _ in _metamodel_edges(table, include_references):
+            write(f"  n{src} --> n{dst}\n")
+            edge_count += 1
+    return {"nodes": len(table.names), "edges": edge_count}
 
-    for cls in classes:
-        label = getattr(cls, "name", "")
-        lines.append(f"class \"{label}\" as {label}")
 
-    for cls in classes:
-        for super_cls in getattr(cls, "eSuperTypes", []):
-            if super_cls in class_set:
-                lines.append(f"{getattr(super_cls, 'name', '')} <|-- {getattr(cls, 'name', '')}")
-                edge_count += 1
-        for ref in _all_features(cls, "eAllReferences"):
-            target = getattr(ref, "eType", None)
-            if target not in class_set:
-                continue
-            if getattr(ref, "containment", False) or include_references:
-                lines.append(f"{getattr(cls, 'name', '')} *-- {getattr(target, 'name', '')}")
-                edge_count += 1
-
-    lines.append("@enduml")
-    with open(output_path, "w", encoding="utf-8") as handle:
-        handle.write("\n".join(lines))
-        handle.write("\n")
-
-    return {"nodes": len(classes), "edges": edge_count}
+def export_metamodel_plantuml(
+    packages: Iterable[object],
+    output_path: str,
+    include_references: bool = False,
+) -> dict[str, int]:
+    table = _metamodel_table(_collect_metamodel_classes(packages))
+    names = table.names
+    edge_count = 0
+    with _open_output(output_path) as handle:
+        write = handle.write
+        write("@startuml\n")
+        for label in names:
+            write(f"class \"{label}\" as {label}\n")
+        for src, dst, inheritance in _metamodel_edges(table, include_references):
+            arrow = "<|--" if inheritance else "*--"
+            write(f"{names[src]} {arrow} {names[dst]}\n")
+            edge_count += 1
+        write("@enduml\n")
+    return {"nodes": len(names), "edges": edge_count}
 
 
 def export_metamodel_gml(
@@ -219,49 +582,23 @@ def export_metamodel_gml(
     output_path: str,
     include_references: bool = False,
 ) -> dict[str, int]:
-    classes = _collect_metamodel_classes(packages)
-    class_set = set(classes)
-    node_ids = {cls: idx for idx, cls in enumerate(classes)}
-    lines = ["graph [", "  directed 1"]
+    table = _metamodel_table(_collect_metamodel_classes(packages))
     edge_count = 0
-
-    for cls in classes:
-        label = getattr(cls, "name", "")
-        lines.append("  node [")
-        lines.append(f"    id {node_ids[cls]}")
-        lines.append(f"    label \"{label}\"")
-        lines.append("  ]")
-
-    for cls in classes:
-        for super_cls in getattr(cls, "eSuperTypes", []):
-            if super_cls in class_set:
-                lines.append("  edge [")
-                lines.append(f"    source {node_ids[super_cls]}")
-                lines.append(f"    target {node_ids[cls]}")
-                lines.append("  ]")
-                edge_count += 1
-        for ref in _all_features(cls, "eAllReferences"):
-            target = getattr(ref, "eType", None)
-            if target not in class_set:
-                continue
-            if getattr(ref, "containment", False) or include_references:
-                lines.append("  edge [")
-                lines.append(f"    source {node_ids[cls]}")
-                lines.append(f"    target {node_ids[target]}")
-                lines.append("  ]")
-                edge_count += 1
-
-    lines.append("]")
-    with open(output_path, "w", encoding="utf-8") as handle:
-        handle.write("\n".join(lines))
-        handle.write("\n")
-
-    return {"nodes": len(classes), "edges": edge_count}
+    with _open_output(output_path) as handle:
+        write = handle.write
+        write("graph [\n  directed 1\n")
+        for node_id, label in zip(table.node_ids, table.names):
+            write(f"  node [\n    id {node_id}\n    label \"{label}\"\n  ]\n")
+        for src, dst, _ in _metamodel_edges(table, include_references):
+            write(f"  edge [\n    source {src}\n    target {dst}\n  ]\n")
+            edge_count += 1
+        write("]\n")
+    return {"nodes": len(table.names), "edges": edge_count}
 
 def preview_prune_metamodel(
     packages: Iterable[object],
-    include_classes: set[str] | None = None,
-    exclude_classes: set[str] | None = None,
+    include_classes: AbstractSet[str] | None = None,
+    exclude_classes: AbstractSet[str] | None = None,
     include_supertypes: bool = False,
 ) -> dict[str, object]:
     include_classes = include_classes or set()
@@ -272,39 +609,30 @@ def preview_prune_metamodel(
         include_classes = set(include_classes)
         include_classes.update(_collect_supertypes(class_objs))
 
+    # One pass sorts every class into the selected or pruned side.
+    table = _metamodel_table(all_classes)
     selected_classes: set[object] = set()
-    for cls in all_classes:
-        name = getattr(cls, "name", "")
-        if include_classes and name not in include_classes:
-            continue
-        if exclude_classes and name in exclude_classes:
-            continue
-        selected_classes.add(cls)
-
-    pruned_classes = set(all_classes) - selected_classes
-
-    containment_edges = 0
-    containment_by_feature: Dict[str, int] = {}
-    reference_edges = 0
-    reference_by_feature: Dict[str, int] = {}
-    for cls in selected_classes:
-        for ref in _all_features(cls, "eAllReferences"):
-            target = getattr(ref, "eType", None)
-            if target in pruned_classes:
-                if getattr(ref, "containment", False):
-                    containment_edges += 1
-                    containment_by_feature[ref.name] = containment_by_feature.get(ref.name, 0) + 1
-                else:
-                    reference_edges += 1
-                    reference_by_feature[ref.name] = reference_by_feature.get(ref.name, 0) + 1
+    pruned_classes: set[object] = set()
+    selected_ids: set[int] = set()
+    pruned_ids: set[int] = set()
+    for cls, name, node_id in zip(all_classes, table.names, table.node_ids):
+        if (include_classes and name not in include_classes) or name in exclude_classes:
+            pruned_classes.add(cls)
+            pruned_ids.add(node_id)
+        else:
+            selected_classes.add(cls)
+            selected_ids.add(node_id)
+
+    # Feature names of the cut edges, one entry per edge; counted at the end.
+    containment_features: List[str] = []
+    reference_features: List[str] = []
+    for node_id in selected_ids:
+        for target, containment, feature in table.refs[node_id]:
+            if target in pruned_ids:
+                (containment_features if containment else reference_features).append(feature)
 
     def _class_counts(classes: Iterable[object]) -> Dict[str, int]:
-        counts: Dict[str, int] = {}
-        for cls in classes:
-            name = getattr(cls, "name", None)
-            if not name:
-                continue
-            counts[name] = counts.get(name, 0) + 1
+        counts = Counter(name for cls in classes if (name := getattr(cls, "name", None)))
         return dict(sorted(counts.items()))
 
     def _class_names(classes: Iterable[object]) -> List[str]:
@@ -321,17 +649,40 @@ def preview_prune_metamodel(
         "selected_classes": _class_counts(selected_classes),
         "pruned_classes": _class_counts(pruned_classes),
         "pruned_class_names": _class_names(pruned_classes),
-        "pruned_containment_edges": containment_edges,
-        "pruned_containment_features": dict(sorted(containment_by_feature.items())),
-        "pruned_reference_edges": reference_edges,
-        "pruned_reference_features": dict(sorted(reference_by_feature.items())),
+        "pruned_containment_edges": len(containment_features),
+        "pruned_containment_features": dict(sorted(Counter(containment_features).items())),
+        "pruned_reference_edges": len(reference_features),
+        "pruned_reference_features": dict(sorted(Counter(reference_features).items())),
     }
 
 
-def _reference_ids(obj: EObject, ref, id_map: Dict[EObject, str]) -> List[str]:
-    value = obj.eGet(ref)
-    values = _iter_values(value)
-    return [id_map[v] for v in values if v in id_map]
+def _feature_ids(
+    obj: EObject, id_map: Dict[EObject, str]
+) -> tuple[List[str], Dict[str, List[str]]]:
+    """Return ``(containment_ids, references)`` from one walk over ``eAllReferences``."""
+    lookup = id_map.get
+    containment: List[str] = []
+    references: Dict[str, List[str]] = {}
+    features = _class_features(obj.eClass)
+    for ref, name, many in zip(
+        features["eAllReferences"], features["all_reference_names"], features["all_reference_many"]
+    ):
+        value = getattr(obj, name)
+        if ref.containment:
+            if value is None:
+                continue
+            if many:
+                containment.extend(
+                    child_id for child_id in map(lookup, value) if child_id is not None
+                )
+            else:
+                child_id = lookup(value)
+                if child_id is not None:
+                    containment.append(child_id)
+        else:
+            targets = _iter_many(value) if many and value is not None else _iter_single(value)
+            references[name] = [ref_id for ref_id in map(lookup, targets) if ref_id is not None]
+    return containment, references
 
 
 def _node_label(obj: EObject) -> str:
@@ -372,7 +723,7 @@ def _proxy_id(obj: EObject) -> str | None:
 
 
 def _resolve_filtered_target(
-    target: EObject, filtered_set: set[EObject], xmi_id_map: dict[str, EObject]
+    target: EObject, filtered_set: AbstractSet[EObject], xmi_id_map: dict[str, EObject]
 ) -> EObject | None:
     if target in filtered_set:
         return target
@@ -382,42 +733,95 @@ def _resolve_filtered_target(
     return None
 
 
+def _matching(
+    predicate: Predicate,
+    objects: Iterable[ObjectInfo],
+    contexts: Dict[EObject, Dict[str, object]] | None = None,
+) -> Iterator[ObjectInfo]:
+    """Yield the ``objects`` accepted by ``predicate``.
+
+    Class-name filters (see ``build_predicate``) are answered from
+    ``obj.eClass.name`` without building an evaluation context per object,
+    except for classes whose attributes shadow the class test. Contexts built
+    for other filters are kept in ``contexts`` when given, so a later pass
+    over the same objects reuses them.
+    """
+
+    def evaluate(info: ObjectInfo) -> bool:
+        if contexts is None:
+            return predicate(build_context(info.obj, info.obj_id, info.path))
+        context = contexts.get(info.obj)
+        if context is None:
+            context = contexts[info.obj] = build_context(info.obj, info.obj_id, info.path)
+        return predicate(context)
+
+    class_names = getattr(predicate, "class_names", None)
+    if class_names is None:
+        for info in objects:
+            if evaluate(info):
+                yield info
+        return
+    # Per-EClass verdict of the shortcut; ``None`` where it does not apply.
+    verdicts: Dict[object, bool | None] = {}
+    for info in objects:
+        eclass = info.obj.eClass
+        if eclass in verdicts:
+            verdict = verdicts[eclass]
+        else:
+            verdict = verdicts[eclass] = (
+                eclass.name in class_names if class_test_applies(eclass) else None
+            )
+        if verdict is None:
+            verdict = evaluate(info)
+        if verdict:
+            yield info
+
+
 def _neighbor_expand(
     objects: List[ObjectInfo],
-    seed_expr: str,
+    seed_expr: FilterExpr,
     hops: int,
     include_containment: bool = True,
     include_references: bool = True,
 ) -> tuple[List[ObjectInfo], dict[str, int]]:
-    predicate = build_predicate(seed_expr)
+    predicate = compile_filter(seed_expr)
     obj_map = {info.obj: info for info in objects}
-    seeds: List[EObject] = []
-    for info in objects:
-        ctx = build_context(info.obj, info.obj_id, info.path)
-        if predicate(ctx):
-            seeds.append(info.obj)
+    seeds = [info.obj for info in _matching(predicate, objects)]
     if not seeds:
         return [], {"seed_nodes": 0, "nodes_seen": 0, "edges_traversed": 0, "max_hops": 0}
 
+    # Feature names to follow, resolved once per class. Containment features
+    # are also references, so with both flags set they are followed twice,
+    # as they always have been.
+    walk_names: Dict[object, tuple[str, ...]] = {}
+
+    def names_for(eclass) -> tuple[str, ...]:
+        features = _class_features(eclass)
+        names = features["all_reference_names"] if include_references else ()
+        if include_containment:
+            names += features["containment_names"]
+        walk_names[eclass] = names
+        return names
+
     seen: set[EObject] = set(seeds)
+    seen_add = seen.add
     frontier: List[EObject] = list(seeds)
     edges_traversed = 0
     depth = 0
     while frontier and depth < hops:
         next_frontier: List[EObject] = []
+        push = next_frontier.append
         for obj in frontier:
-            refs = []
-            if include_references:
-                refs.extend(_all_features(obj, "eAllReferences"))
-            if include_containment:
-                refs.extend(_containment_features(obj))
-            for ref in refs:
-                value = obj.eGet(ref)
-                for target in _iter_values(value):
+            eclass = obj.eClass
+            names = walk_names.get(eclass)
+            if names is None:
+                names = names_for(eclass)
+            for name in names:
+                for target in _iter_values(getattr(obj, name)):
                     edges_traversed += 1
                     if target not in seen:
-                        seen.add(target)
-                        next_frontier.append(target)
+                        seen_add(target)
+                        push(target)
         frontier = next_frontier
         depth += 1
 
@@ -434,20 +838,17 @@ def _neighbor_expand(
 
 def _expand_from(
     objects: List[ObjectInfo],
-    expand_expr: str,
+    expand_expr: FilterExpr,
     expand_depth: int | None,
-    expand_classes: set[str] | None,
+    expand_classes: AbstractSet[str] | None,
+    contexts: Dict[EObject, Dict[str, object]] | None = None,
 ) -> tuple[List[ObjectInfo], dict[str, int], dict[EObject, str], dict[EObject, str]]:
-    predicate = build_predicate(expand_expr)
+    predicate = compile_filter(expand_expr)
     obj_map = {info.obj: info for info in objects}
-    id_map = {info.obj: info.obj_id for info in objects}
-    start: List[EObject] = []
-    for info in objects:
-        if expand_classes and info.obj.eClass.name not in expand_classes:
-            continue
-        ctx = build_context(info.obj, info.obj_id, info.path)
-        if predicate(ctx):
-            start.append(info.obj)
+    candidates: Iterable[ObjectInfo] = objects
+    if expand_classes:
+        candidates = (info for info in objects if info.obj.eClass.name in expand_classes)
+    start = [info.obj for info in _matching(predicate, candidates, contexts)]
 
     if not start:
         return (
@@ -463,66 +864,55 @@ def _expand_from(
             {},
         )
 
-    seen: set[EObject] = set(start)
+    # The parent links double as the visited set (identity-hashed EObjects make
+    # a dict probe as cheap as a set one); paths are only spelled out once the
+    # walk is over, for the objects it actually returns.
+    parent: dict[EObject, EObject | None] = dict.fromkeys(start)
     frontier: List[EObject] = list(start)
-    path_map: dict[EObject, str] = {obj: f"/{_node_label(obj)}" for obj in start}
-    id_path_map: dict[EObject, str] = {
-        obj: f"/{_id_label(obj, id_map[obj])}" for obj in start if obj in id_map
-    }
     depth = 0
     edges_traversed = 0
     loops_detected = 0
     while frontier and (expand_depth is None or expand_depth < 0 or depth < expand_depth):
         next_frontier: List[EObject] = []
+        push = next_frontier.append
         for obj in frontier:
-            for ref in _all_features(obj, "eAllReferences"):
-                value = obj.eGet(ref)
+            features = _class_features(obj.eClass)
+            for name, many in zip(features["all_reference_names"], features["all_reference_many"]):
+                value = getattr(obj, name)
                 if value is None:
                     continue
-                if ref.many:
-                    try:
-                        items = list(value)
-                    except Exception:  # noqa: BLE001
-                        items = []
-                    for idx, target in enumerate(items):
-                        if not isinstance(target, EObject):
-                            continue
+                if many:
+                    for target in _iter_many(value):
                         edges_traversed += 1
-                        if expand_classes and target.eClass.name not in expand_classes:
+                        if expand_classes and _class_name(target) not in expand_classes:
                             continue
-                        if target not in seen:
-                            seen.add(target)
-                            next_frontier.append(target)
-                            path_map[target] = f"{path_map[obj]}/{_node_label(target)}"
-                            id_path_map[target] = (
-                                f"{id_path_map.get(obj, '')}/{_id_label(target, id_map[target])}"
-                            )
+                        if target not in parent:
+                            parent[target] = obj
+                            push(target)
                         else:
                             loops_detected += 1
                 else:
-                    target = value if isinstance(value, EObject) else None
-                    if target is None:
+                    if not isinstance(value, EObject):
                         continue
-                    if expand_classes and target.eClass.name not in expand_classes:
+                    target = value
+                    if expand_classes and _class_name(target) not in expand_classes:
                         continue
                     edges_traversed += 1
-                    if target not in seen:
-                        seen.add(target)
-                        next_frontier.append(target)
-                        path_map[target] = f"{path_map[obj]}/{_node_label(target)}"
-                        id_path_map[target] = (
-                            f"{id_path_map.get(obj, '')}/{_id_label(target, id_map[target])}"
-                        )
+                    if target not in parent:
+                        parent[target] = obj
+                        push(target)
                     else:
                         loops_detected += 1
         frontier = next_frontier
         depth += 1
 
+    selected = [obj_map[obj] for obj in parent if obj in obj_map]
+    path_map, id_path_map = _expansion_paths(parent, selected)
     return (
-        [obj_map[obj] for obj in seen if obj in obj_map],
+        selected,
         {
             "start_nodes": len(start),
-            "nodes_seen": len(seen),
+            "nodes_seen": len(parent),
             "edges_traversed": edges_traversed,
             "loops_detected": loops_detected,
             "max_depth": depth,
@@ -532,32 +922,72 @@ def _expand_from(
     )
 
 
-def _apply_filter(
+def _expansion_paths(
+    parent: dict[EObject, EObject | None], selected: List[ObjectInfo]
+) -> tuple[dict[EObject, str], dict[EObject, str]]:
+    """Build label and id paths for ``selected`` from the BFS parent links.
+
+    Ancestors outside ``selected`` get paths only when a selected object needs
+    them; each one is built once.
+    """
+    id_map = {info.obj: info.obj_id for info in selected}
+    path_map: dict[EObject, str] = {}
+    id_path_map: dict[EObject, str] = {}
+    for info in selected:
+        chain: List[EObject] = []
+        node: EObject | None = info.obj
+        while node is not None and node not in path_map:
+            chain.append(node)
+            node = parent[node]
+        for node in reversed(chain):
+            up = parent[node]
+            label = _id_label(node, id_map.get(node, ""))
+            if up is None:
+                path_map[node] = f"/{_node_label(node)}"
+                id_path_map[node] = f"/{label}"
+            else:
+                path_map[node] = f"{path_map[up]}/{_node_label(node)}"
+                id_path_map[node] = f"{id_path_map[up]}/{label}"
+    return path_map, id_path_map
+
+
+def _neighbor_stage(
     objects: List[ObjectInfo],
-    filter_expr: str | None,
-    expand_expr: str | None,
-    expand_depth: int | None,
-    expand_classes: set[str] | None,
-    neighbor_expr: str | None = None,
-    neighbor_hops: int | None = None,
-) -> tuple[
-    List[ObjectInfo],
-    dict[str, int] | None,
-    dict[EObject, str] | None,
-    dict[EObject, str] | None,
-]:
-    neighbor_metrics = None
+    neighbor_expr: FilterExpr | None,
+    neighbor_hops: int | None,
+) -> tuple[List[ObjectInfo], dict[str, int] | None]:
     if neighbor_expr and neighbor_hops is not None:
-        objects, neighbor_metrics = _neighbor_expand(
+        return _neighbor_expand(
             objects,
             neighbor_expr,
             neighbor_hops,
             include_containment=True,
             include_references=True,
         )
+    return objects, None
+
+
+def _select(
+    objects: List[ObjectInfo],
+    neighbor_metrics: dict[str, int] | None,
+    filter_expr: FilterExpr | None,
+    expand_expr: FilterExpr | None,
+    expand_depth: int | None,
+    expand_classes: AbstractSet[str] | None,
+) -> tuple[
+    List[ObjectInfo],
+    dict[str, int] | None,
+    dict[EObject, str] | None,
+    dict[EObject, str] | None,
+]:
+    # The expansion's seed pass builds a context per candidate; the filter pass
+    # over the expanded objects reuses them instead of building them again.
+    contexts: Dict[EObject, Dict[str, object]] | None = (
+        {} if expand_expr and filter_expr else None
+    )
     if expand_expr:
         filtered, metrics, path_map, id_path_map = _expand_from(
-            objects, expand_expr, expand_depth, expand_classes
+            objects, expand_expr, expand_depth, expand_classes, contexts
         )
     else:
         filtered = objects
@@ -570,12 +1000,7 @@ def _apply_filter(
         elif neighbor_metrics:
             metrics = neighbor_metrics
         return filtered, metrics, path_map, id_path_map
-    predicate = build_predicate(filter_expr)
-    result: List[ObjectInfo] = []
-    for info in filtered:
-        ctx = build_context(info.obj, info.obj_id, info.path)
-        if predicate(ctx):
-            result.append(info)
+    result = list(_matching(compile_filter(filter_expr), filtered, contexts))
     if path_map is not None:
         path_map = {info.obj: path_map[info.obj] for info in result if info.obj in path_map}
     if id_path_map is not None:
@@ -589,203 +1014,304 @@ def _apply_filter(
     return result, metrics, path_map, id_path_map
 
 
-def export_json(
+def _apply_filter(
+    objects: List[ObjectInfo],
+    filter_expr: FilterExpr | None,
+    expand_expr: FilterExpr | None,
+    expand_depth: int | None,
+    expand_classes: AbstractSet[str] | None,
+    neighbor_expr: FilterExpr | None = None,
+    neighbor_hops: int | None = None,
+) -> tuple[
+    List[ObjectInfo],
+    dict[str, int] | None,
+    dict[EObject, str] | None,
+    dict[EObject, str] | None,
+]:
+    objects, neighbor_metrics = _neighbor_stage(objects, neighbor_expr, neighbor_hops)
+    return _select(
+        objects, neighbor_metrics, filter_expr, expand_expr, expand_depth, expand_classes
+    )
+
+
+def _attribute_values(obj: EObject, skip_defaults: bool = False) -> Dict[str, object]:
+    """Serialize ``obj``'s attributes by name.
+
+    With ``skip_defaults`` only attributes pyecore records as explicitly set
+    are included, whatever their value.
+    """
+    features = _class_features(obj.eClass)
+    attributes: Dict[str, object] = {}
+    names = features["attribute_names"]
+    serializers = features["attribute_serializers"]
+    isset = getattr(obj, "_isset", None) if skip_defaults else None
+    if isset is not None:
+        for attr, name, serialize in zip(features["eAllAttributes"], names, serializers):
+            if attr in isset:
+                value = getattr(obj, name)
+                attributes[name] = value if serialize is None else serialize(value)
+        return attributes
+    for name, serialize in zip(names, serializers):
+        value = getattr(obj, name)
+        attributes[name] = value if serialize is None else serialize(value)
+    return attributes
+
+
+def _json_entry(
+    info: ObjectInfo, id_map: Dict[EObject, str], skip_defaults: bool = False
+) -> Dict[str, object]:
+    obj = info.obj
+    attributes = _attribute_values(obj, skip_defaults)
+    containment_ids, references = _feature_ids(obj, id_map)
+
+    preferred_id = id_map[obj]
+    return {
+        "id": preferred_id,
+        "local_id": info.obj_id,
+        "ID": preferred_id,
+        "eClass": _class_features(obj.eClass)["name"],
+        "nsURI": obj.eClass.ePackage.nsURI if obj.eClass.ePackage else None,
+        "attributes": attributes,
+        "containment": containment_ids,
+        "references": references,
+        "path": info.path,
+    }
+
+
+@dataclass
+class ExpansionResult:
+    """Filtered/expanded selection shared by the JSON, edges and path exporters."""
+
+    objects: List[ObjectInfo]
+    containment_edges: EdgeTable
+    metrics: dict[str, int] | None
+    path_map: dict[EObject, str] | None
+    id_path_map: dict[EObject, str] | None
+    id_map: Dict[EObject, str] | None = None
+
+    def preferred_ids(self) -> Dict[EObject, str]:
+        """Preferred id per selected object, built on first use and then shared."""
+        if self.id_map is None:
+            self.id_map = _preferred_id_map(self.objects)
+        return self.id_map
+
+
+def compute_expansion(
     roots: Iterable[EObject],
-    output_path: str,
-    filter_expr: str | None = None,
-    expand_expr: str | None = None,
+    filter_expr: FilterExpr | None = None,
+    expand_expr: FilterExpr | None = None,
     expand_depth: int | None = None,
-    expand_classes: set[str] | None = None,
-    neighbor_expr: str | None = None,
+    expand_classes: AbstractSet[str] | None = None,
+    neighbor_expr: FilterExpr | None = None,
     neighbor_hops: int | None = None,
-) -> tuple[List[Dict[str, object]], dict[str, int] | None]:
-    objects, edges = build_object_graph(roots)
-    objects, metrics, _, _ = _apply_filter(
+    graph: ObjectGraph | None = None,
+) -> ExpansionResult:
+    """Run the neighbor/expand/filter pipeline once for reuse across exporters.
+
+    Pass the result as ``expansion=`` to ``export_json``, ``export_edges``,
+    ``export_paths`` and ``export_path_ids`` to skip recomputing it. ``graph``
+    reuses a ``build_object_graph`` result for ``roots``.
+    """
+    objects, containment_edges = graph or build_object_graph(roots)
+    objects, metrics, path_map, id_path_map = _apply_filter(
         objects,
-        filter_expr,
-        expand_expr,
+        compile_filter(filter_expr),
+        compile_filter(expand_expr),
         expand_depth,
         expand_classes,
-        neighbor_expr=neighbor_expr,
+        neighbor_expr=compile_filter(neighbor_expr),
         neighbor_hops=neighbor_hops,
     )
-    id_map = {info.obj: _preferred_id(info.obj, info.obj_id) for info in objects}
+    return ExpansionResult(objects, containment_edges, metrics, path_map, id_path_map)
 
-    entries: List[Dict[str, object]] = []
 
-    for info in objects:
-        obj = info.obj
-        attributes: Dict[str, object] = {}
-        for attr in _all_features(obj, "eAllAttributes"):
-            value = obj.eGet(attr)
-            if attr.many:
-                attributes[attr.name] = _json_safe(list(value)) if value is not None else []
-            else:
-                attributes[attr.name] = _json_safe(value)
+def _preferred_id_map(objects: List[ObjectInfo]) -> Dict[EObject, str]:
+    return {info.obj: _preferred_id(info.obj, info.obj_id) for info in objects}
 
-        containment_ids: List[str] = []
-        for ref in _containment_features(obj):
-            value = obj.eGet(ref)
-            if value is None:
-                continue
-            if ref.many:
-                for child in list(value):
-                    if child in id_map:
-                        containment_ids.append(id_map[child])
-            else:
-                if value in id_map:
-                    containment_ids.append(id_map[value])
-
-        references: Dict[str, List[str]] = {}
-        for ref in _all_features(obj, "eAllReferences"):
-            if ref.containment:
-                continue
-            references[ref.name] = _reference_ids(obj, ref, id_map)
-
-        entries.append(
-            {
-                "id": _preferred_id(obj, info.obj_id),
-                "local_id": info.obj_id,
-                "ID": _id_label(obj, info.obj_id),
-                "eClass": obj.eClass.name,
-                "nsURI": obj.eClass.ePackage.nsURI if obj.eClass.ePackage else None,
-                "attributes": attributes,
-                "containment": containment_ids,
-                "references": references,
-                "path": info.path,
-            }
-        )
-
-    with open(output_path, "w", encoding="utf-8") as handle:
-        json.dump(entries, handle, indent=2)
 
-    return entries, metrics
+def _write_json_entries(
+    objects: List[ObjectInfo],
+    output_path: str,
+    id_map: Dict[EObject, str] | None = None,
+    skip_defaults: bool = False,
+) -> int:
+    if id_map is None:
+        id_map = _preferred_id_map(objects)
+    entries = (_json_entry(info, id_map, skip_defaults) for info in objects)
+    with _open_output(output_path, binary=True) as handle:
+        return _write_json_array(handle, entries)
 
 
-def export_edges(
+def export_json(
     roots: Iterable[EObject],
     output_path: str,
-    filter_expr: str | None = None,
-    expand_expr: str | None = None,
+    filter_expr: FilterExpr | None = None,
+    expand_expr: FilterExpr | None = None,
     expand_depth: int | None = None,
-    expand_classes: set[str] | None = None,
-    neighbor_expr: str | None = None,
+    expand_classes: AbstractSet[str] | None = None,
+    neighbor_expr: FilterExpr | None = None,
     neighbor_hops: int | None = None,
-) -> tuple[List[Dict[str, str | bool]], dict[str, int] | None]:
-    objects, containment_edges = build_object_graph(roots)
-    objects, metrics, _, _ = _apply_filter(
-        objects,
-        filter_expr,
-        expand_expr,
-        expand_depth,
-        expand_classes,
-        neighbor_expr=neighbor_expr,
-        neighbor_hops=neighbor_hops,
+    expansion: ExpansionResult | None = None,
+    graph: ObjectGraph | None = None,
+    skip_defaults: bool = False,
+) -> tuple[int, dict[str, int] | None]:
+    """Write the selected objects as a JSON array to ``output_path``.
+
+    ``skip_defaults`` omits attributes that were never explicitly set; one set
+    to its default value is kept.
+    """
+    if expansion is None:
+        expansion = compute_expansion(
+            roots,
+            filter_expr,
+            expand_expr,
+            expand_depth,
+            expand_classes,
+            neighbor_expr=neighbor_expr,
+            neighbor_hops=neighbor_hops,
+            graph=graph,
+        )
+    count = _write_json_entries(
+        expansion.objects, output_path, expansion.preferred_ids(), skip_defaults
     )
-    id_map = {info.obj: _preferred_id(info.obj, info.obj_id) for info in objects}
-    local_to_preferred = {info.obj_id: id_map[info.obj] for info in objects}
-    edges: List[Dict[str, str | bool]] = list(containment_edges)
-    remapped_edges: List[Dict[str, str | bool]] = []
-    for edge in edges:
-        src = local_to_preferred.get(edge["src_id"])
-        dst = local_to_preferred.get(edge["dst_id"])
+    return count, expansion.metrics
+
+
+_EDGE_FIELDS = ("src_id", "src_class", "feature", "dst_id", "dst_class", "containment")
+
+
+def _iter_edge_rows(
+    objects: List[ObjectInfo],
+    containment_edges: EdgeTable,
+    id_map: Dict[EObject, str],
+) -> Iterator[tuple[str, str, str, str, str, bool]]:
+    """Yield CSV rows for edges whose endpoints are both in ``id_map``."""
+    for src_info, feature, dst_info in containment_edges.rows():
+        src = id_map.get(src_info.obj)
+        dst = id_map.get(dst_info.obj)
         if not src or not dst:
             continue
-        remapped = dict(edge)
-        remapped["src_id"] = src
-        remapped["dst_id"] = dst
-        remapped_edges.append(remapped)
-    edges = remapped_edges
+        yield src, _class_name(src_info.obj), feature, dst, _class_name(dst_info.obj), True
 
     for info in objects:
         obj = info.obj
-        for ref in _all_features(obj, "eAllReferences"):
-            if ref.containment:
-                continue
-            value = obj.eGet(ref)
+        features = _class_features(obj.eClass)
+        names = features["reference_names"]
+        # Attribute-only classes are common; skip them before any other work.
+        if not names:
+            continue
+        src = id_map[obj]
+        src_class = features["name"]
+        for name, many in zip(names, features["reference_many"]):
+            value = getattr(obj, name)
             if value is None:
                 continue
-            for target in _iter_values(value):
-                if target not in id_map:
+            for target in _iter_many(value) if many else _iter_single(value):
+                dst = id_map.get(target)
+                if dst is None:
                     continue
-                edges.append(
-                    {
-                        "src_id": info.obj_id,
-                        "src_class": obj.eClass.name,
-                        "feature": ref.name,
-                        "dst_id": id_map[target],
-                        "dst_class": target.eClass.name,
-                        "containment": False,
-                    }
-                )
+                yield src, src_class, name, dst, _class_name(target), False
 
-    id_set = set(id_map.values())
-    edges = [edge for edge in edges if edge["src_id"] in id_set and edge["dst_id"] in id_set]
 
-    with open(output_path, "w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(
-            handle,
-            fieldnames=["src_id", "src_class", "feature", "dst_id", "dst_class", "containment"],
-        )
-        writer.writeheader()
-        writer.writerows(edges)
-
-    return edges, metrics
+def _write_edges(
+    objects: List[ObjectInfo],
+    containment_edges: EdgeTable,
+    output_path: str,
+    id_map: Dict[EObject, str] | None = None,
+) -> int:
+    if id_map is None:
+        id_map = _preferred_id_map(objects)
+    count = 0
+    with _open_output(output_path, newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(_EDGE_FIELDS)
+        write = handle.write
+        # Ids and names almost never need quoting, so rows are formatted
+        # directly; the csv writer only handles rows that do.
+        for row in _iter_edge_rows(objects, containment_edges, id_map):
+            line = f"{row[0]},{row[1]},{row[2]},{row[3]},{row[4]},{row[5]}"
+            if line.count(",") != 5 or '"' in line or "\n" in line or "\r" in line:
+                writer.writerow(row)
+            else:
+                write(line + "\r\n")
+            count += 1
+    return count
 
 
-def export_paths(
+def export_edges(
     roots: Iterable[EObject],
     output_path: str,
-    filter_expr: str | None = None,
-    expand_expr: str | None = None,
+    filter_expr: FilterExpr | None = None,
+    expand_expr: FilterExpr | None = None,
     expand_depth: int | None = None,
-    expand_classes: set[str] | None = None,
-    neighbor_expr: str | None = None,
+    expand_classes: AbstractSet[str] | None = None,
+    neighbor_expr: FilterExpr | None = None,
     neighbor_hops: int | None = None,
-) -> tuple[List[str], dict[str, int] | None]:
-    objects, _ = build_object_graph(roots)
-    objects, metrics, path_map, _ = _apply_filter(
-        objects,
-        filter_expr,
-        expand_expr,
-        expand_depth,
-        expand_classes,
-        neighbor_expr=neighbor_expr,
-        neighbor_hops=neighbor_hops,
+    expansion: ExpansionResult | None = None,
+    graph: ObjectGraph | None = None,
+) -> tuple[int, dict[str, int] | None]:
+    if expansion is None:
+        expansion = compute_expansion(
+            roots,
+            filter_expr,
+            expand_expr,
+            expand_depth,
+            expand_classes,
+            neighbor_expr=neighbor_expr,
+            neighbor_hops=neighbor_hops,
+            graph=graph,
+        )
+    count = _write_edges(
+        expansion.objects, expansion.containment_edges, output_path, expansion.preferred_ids()
     )
-    with open(output_path, "w", encoding="utf-8") as handle:
+    return count, expansion.metrics
+
+
+def _write_paths(
+    objects: List[ObjectInfo], path_map: dict[EObject, str] | None, output_path: str
+) -> List[str]:
+    with _open_output(output_path) as handle:
         if path_map is None:
-            return [], metrics
+            return []
         paths = [path_map[info.obj] for info in objects if info.obj in path_map]
         paths = sorted(set(paths))
         for path in paths:
             handle.write(f"{path}\n")
-    return paths, metrics
+    return paths
 
 
-def export_path_ids(
+def export_paths(
     roots: Iterable[EObject],
     output_path: str,
-    filter_expr: str | None = None,
-    expand_expr: str | None = None,
+    filter_expr: FilterExpr | None = None,
+    expand_expr: FilterExpr | None = None,
     expand_depth: int | None = None,
-    expand_classes: set[str] | None = None,
-    neighbor_expr: str | None = None,
+    expand_classes: AbstractSet[str] | None = None,
+    neighbor_expr: FilterExpr | None = None,
     neighbor_hops: int | None = None,
-) -> tuple[List[tuple[str, str]], dict[str, int] | None]:
-    objects, _ = build_object_graph(roots)
-    objects, metrics, _, id_path_map = _apply_filter(
-        objects,
-        filter_expr,
-        expand_expr,
-        expand_depth,
-        expand_classes,
-        neighbor_expr=neighbor_expr,
-        neighbor_hops=neighbor_hops,
-    )
-    with open(output_path, "w", encoding="utf-8") as handle:
+    expansion: ExpansionResult | None = None,
+    graph: ObjectGraph | None = None,
+) -> tuple[List[str], dict[str, int] | None]:
+    if expansion is None:
+        expansion = compute_expansion(
+            roots,
+            filter_expr,
+            expand_expr,
+            expand_depth,
+            expand_classes,
+            neighbor_expr=neighbor_expr,
+            neighbor_hops=neighbor_hops,
+            graph=graph,
+        )
+    return _write_paths(expansion.objects, expansion.path_map, output_path), expansion.metrics
+
+
+def _write_path_ids(
+    objects: List[ObjectInfo], id_path_map: dict[EObject, str] | None, output_path: str
+) -> List[tuple[str, str]]:
+    with _open_output(output_path) as handle:
         if id_path_map is None:
-            return [], metrics
+            return []
         pairs = [
             (info.obj_id, id_path_map[info.obj])
             for info in objects
@@ -794,17 +1320,43 @@ def export_path_ids(
         pairs = sorted(set(pairs))
         for _, id_path in pairs:
             handle.write(f"{id_path}\n")
-    return pairs, metrics
+    return pairs
+
+
+def export_path_ids(
+    roots: Iterable[EObject],
+    output_path: str,
+    filter_expr: FilterExpr | None = None,
+    expand_expr: FilterExpr | None = None,
+    expand_depth: int | None = None,
+    expand_classes: AbstractSet[str] | None = None,
+    neighbor_expr: FilterExpr | None = None,
+    neighbor_hops: int | None = None,
+    expansion: ExpansionResult | None = None,
+    graph: ObjectGraph | None = None,
+) -> tuple[List[tuple[str, str]], dict[str, int] | None]:
+    if expansion is None:
+        expansion = compute_expansion(
+            roots,
+            filter_expr,
+            expand_expr,
+            expand_depth,
+            expand_classes,
+            neighbor_expr=neighbor_expr,
+            neighbor_hops=neighbor_hops,
+            graph=graph,
+        )
+    return _write_path_ids(expansion.objects, expansion.id_path_map, output_path), expansion.metrics
 
 
-def summarize_model(roots: Iterable[EObject]) -> str:
-    objects, _ = build_object_graph(roots)
-    class_counts: dict[str, int] = {}
+def summarize_model(roots: Iterable[EObject], graph: ObjectGraph | None = None) -> str:
+    objects, _ = graph or build_object_graph(roots, record_edges=False)
+    class_counts: Counter[str] = Counter()
     class_attrs: dict[str, list[dict[str, object]]] = {}
     class_refs: dict[str, list[dict[str, object]]] = {}
     for info in objects:
         name = info.obj.eClass.name
-        class_counts[name] = class_counts.get(name, 0) + 1
+        class_counts[name] += 1
         if name not in class_attrs:
             attrs: list[dict[str, object]] = []
             for attr in _all_features(info.obj, "eAllAttributes"):
@@ -835,17 +1387,40 @@ def summarize_model(roots: Iterable[EObject]) -> str:
     return "\n".join(lines)
 
 
+def _iter_contents(roots: Iterable[EObject]) -> Iterator[EObject]:
+    """Yield every object reachable by containment once, in preorder."""
+    seen: set[EObject] = set()
+    stack = list(reversed(list(roots)))
+    while stack:
+        obj = stack.pop()
+        if obj in seen:
+            continue
+        seen.add(obj)
+        yield obj
+        children: List[EObject] = []
+        for ref in _containment_features(obj):
+            value = obj.eGet(ref)
+            if value is None:
+                continue
+            if ref.many:
+                children.extend(child for child in value if child is not None)
+            else:
+                children.append(value)
+        stack.extend(reversed(children))
+
+
 def model_dump(roots: Iterable[EObject]) -> dict[str, object]:
-    objects, _ = build_object_graph(roots)
-    class_counts: dict[str, int] = {}
+    total = 0
+    class_counts: Counter[str] = Counter()
     class_attrs: dict[str, list[str]] = {}
     class_refs: dict[str, list[str]] = {}
-    for info in objects:
-        name = info.obj.eClass.name
-        class_counts[name] = class_counts.get(name, 0) + 1
+    for obj in _iter_contents(roots):
+        total += 1
+        name = obj.eClass.name
+        class_counts[name] += 1
         if name not in class_attrs:
-            attrs = [a.name for a in _all_features(info.obj, "eAllAttributes")]
-            refs = [r.name for r in _all_features(info.obj, "eAllReferences")]
+            attrs = [a.name for a in _all_features(obj, "eAllAttributes")]
+            refs = [r.name for r in _all_features(obj, "eAllReferences")]
             class_attrs[name] = attrs
             class_refs[name] = refs
     classes = []
@@ -859,72 +1434,192 @@ def model_dump(roots: Iterable[EObject]) -> dict[str, object]:
             }
         )
     return {
-        "total_objects": len(objects),
+        "total_objects": total,
         "classes": classes,
     }
 
 
-def dump_instances_by_class(
-    roots: Iterable[EObject], filter_expr: str | None = None
+def _instance_entry(
+    info: ObjectInfo, id_map: Dict[EObject, str], skip_defaults: bool = False
 ) -> dict[str, object]:
-    objects, _ = build_object_graph(roots)
-    id_map = {info.obj: _preferred_id(info.obj, info.obj_id) for info in objects}
-    classes: dict[str, list[dict[str, object]]] = {}
-    predicate = build_predicate(filter_expr) if filter_expr else None
+    obj = info.obj
+    containment_ids, references = _feature_ids(obj, id_map)
+    preferred_id = id_map[obj]
+    return {
+        "id": preferred_id,
+        "local_id": info.obj_id,
+        "ID": preferred_id,
+        "eClass": _class_features(obj.eClass)["name"],
+        "nsURI": obj.eClass.ePackage.nsURI if obj.eClass.ePackage else None,
+        "path": info.path,
+        "attributes": _attribute_values(obj, skip_defaults),
+        "containment": containment_ids,
+        "references": references,
+    }
+
+
+def _group_instances_by_class(
+    objects: List[ObjectInfo], filter_expr: FilterExpr | None
+) -> dict[str, List[ObjectInfo]]:
+    predicate = compile_filter(filter_expr)
+    if predicate:
+        objects = _matching(predicate, objects)
+    groups: dict[str, List[ObjectInfo]] = {}
     for info in objects:
-        if predicate:
-            ctx = build_context(info.obj, info.obj_id, info.path)
-            if not predicate(ctx):
-                continue
-        obj = info.obj
-        cls_name = obj.eClass.name
-        entry: dict[str, object] = {
-            "id": _preferred_id(obj, info.obj_id),
-            "local_id": info.obj_id,
-            "ID": _id_label(obj, info.obj_id),
-            "eClass": cls_name,
-            "nsURI": obj.eClass.ePackage.nsURI if obj.eClass.ePackage else None,
-            "path": info.path,
-            "attributes": {},
-            "containment": [],
-            "references": {},
-        }
-        for attr in _all_features(obj, "eAllAttributes"):
-            value = obj.eGet(attr)
-            if attr.many:
-                entry["attributes"][attr.name] = _json_safe(list(value)) if value is not None else []
-            else:
-                entry["attributes"][attr.name] = _json_safe(value)
-        for ref in _containment_features(obj):
-            value = obj.eGet(ref)
-            if value is None:
-                continue
-            if ref.many:
-                for child in list(value):
-                    if child in id_map:
-                        entry["containment"].append(id_map[child])
-            else:
-                if value in id_map:
-                    entry["containment"].append(id_map[value])
-        for ref in _all_features(obj, "eAllReferences"):
-            if ref.containment:
-                continue
-            entry["references"][ref.name] = _reference_ids(obj, ref, id_map)
-        classes.setdefault(cls_name, []).append(entry)
+        groups.setdefault(_class_name(info.obj), []).append(info)
+    return groups
+
+
+def dump_instances_by_class(
+    roots: Iterable[EObject],
+    filter_expr: FilterExpr | None = None,
+    graph: ObjectGraph | None = None,
+    skip_defaults: bool = False,
+) -> dict[str, object]:
+    objects, _ = graph or build_object_graph(roots, record_edges=False)
+    id_map = _preferred_id_map(objects)
+    groups = _group_instances_by_class(objects, filter_expr)
+    classes = {
+        cls_name: [_instance_entry(info, id_map, skip_defaults) for info in infos]
+        for cls_name, infos in groups.items()
+    }
     return {
         "total_objects": len(objects),
         "classes": classes,
     }
 
 
+def export_instances_by_class(
+    roots: Iterable[EObject],
+    output_path: str,
+    filter_expr: FilterExpr | None = None,
+    graph: ObjectGraph | None = None,
+    skip_defaults: bool = False,
+) -> int:
+    """Stream the ``dump_instances_by_class`` payload to ``output_path``.
+
+    Entries are serialized one at a time, so peak memory stays proportional to
+    a single entry rather than the whole payload. Returns the number of
+    instances written. ``skip_defaults`` is as for ``export_json``.
+    """
+    objects, _ = graph or build_object_graph(roots, record_edges=False)
+    id_map = _preferred_id_map(objects)
+    groups = _group_instances_by_class(objects, filter_expr)
+    count = 0
+    with _open_output(output_path, binary=True) as handle:
+        handle.write(b'{\n  "total_objects": %d,\n  "classes": ' % len(objects))
+        if not groups:
+            handle.write(b"{}")
+        for idx, (cls_name, infos) in enumerate(groups.items()):
+            handle.write(b",\n    " if idx else b"{\n    ")
+            handle.write(_json_bytes(cls_name))
+            handle.write(b": ")
+            count += _write_json_array(
+                handle, (_instance_entry(info, id_map, skip_defaults) for info in infos), depth=2
+            )
+        if groups:
+            handle.write(b"\n  }")
+        handle.write(b"\n}")
+    return count
+
+
+def _diagram_label(obj: EObject) -> str:
+    name = getattr(obj, "name", None)
+    return name if isinstance(name, str) and name else obj.eClass.name
+
+
+# Diagram reference edges as parallel ``array('i')`` columns of positions in
+# the filtered object list, like ``EdgeTable`` does for containment.
+_DiagramEdges = Tuple[array, array]
+
+
+def _diagram_edges(filtered: List[ObjectInfo]) -> _DiagramEdges:
+    """Resolve reference edges between filtered objects for the diagram writers."""
+    index: Dict[EObject, int] = {}
+    xmi_id_map: dict[str, EObject] = {}
+    for idx, info in enumerate(filtered):
+        obj = info.obj
+        index[obj] = idx
+        xmi_id = _xmi_id(obj)
+        if xmi_id:
+            xmi_id_map[xmi_id] = obj
+    index_get = index.get
+    src_col = array("i")
+    dst_col = array("i")
+    add_src = src_col.append
+    add_dst = dst_col.append
+    # Resolution of targets outside ``filtered``, memoized: one proxy or copy
+    # is often referenced from many filtered objects.
+    outside: Dict[EObject, int | None] = {}
+    for src, info in enumerate(filtered):
+        obj = info.obj
+        features = _class_features(obj.eClass)
+        names = features["all_reference_names"]
+        if not names:
+            continue
+        for name, many in zip(names, features["all_reference_many"]):
+            value = getattr(obj, name)
+            if value is None:
+                continue
+            for target in _iter_many(value) if many else _iter_single(value):
+                # Most targets are filtered objects themselves; only the rest
+                # (proxies, copies) go through the xmi:id lookup.
+                dst = index_get(target)
+                if dst is None:
+                    if target in outside:
+                        dst = outside[target]
+                    else:
+                        resolved = _resolve_filtered_target(target, index.keys(), xmi_id_map)
+                        dst = outside[target] = None if resolved is None else index[resolved]
+                    if dst is None:
+                        continue
+                add_src(src)
+                add_dst(dst)
+    return src_col, dst_col
+
+
+def _diagram_ids(filtered: List[ObjectInfo]) -> List[str]:
+    """Mermaid/PlantUML node ids, index-aligned with ``filtered``."""
+    return [_preferred_id(info.obj, info.obj_id).replace("-", "_") for info in filtered]
+
+
+def _diagram_result(
+    node_count: int, edge_count: int, metrics: dict[str, int] | None
+) -> dict[str, int]:
+    result = {"nodes": node_count, "edges": edge_count}
+    if metrics:
+        result.update(metrics)
+    return result
+
+
+def _write_mermaid(
+    filtered: List[ObjectInfo],
+    edges: _DiagramEdges,
+    output_path: str,
+    metrics: dict[str, int] | None = None,
+    ids: List[str] | None = None,
+) -> dict[str, int]:
+    if ids is None:
+        ids = _diagram_ids(filtered)
+    with _open_output(output_path) as handle:
+        handle.write("graph TD\n")
+        for info, node_id in zip(filtered, ids):
+            label = _diagram_label(info.obj).replace("\"", "'")
+            handle.write(f"  {node_id}[\"{label}\"]\n")
+        for src, dst in zip(*edges):
+            handle.write(f"  {ids[src]} --> {ids[dst]}\n")
+    return _diagram_result(len(filtered), len(edges[0]), metrics)
+
+
 def export_mermaid(
     roots: Iterable[EObject],
     output_path: str,
-    filter_expr: str | None = None,
-    neighbor_expr: str | None = None,
+    filter_expr: FilterExpr | None = None,
+    neighbor_expr: FilterExpr | None = None,
     neighbor_hops: int | None = None,
+    graph: ObjectGraph | None = None,
 ) -> dict[str, int]:
-    objects, _ = build_object_graph(roots)
+    objects, _ = graph or build_object_graph(roots, record_edges=False)
     filtered, metrics, _, _ = _apply_filter(
         objects,
         filter_expr,
@@ -934,54 +1629,38 @@ def export_mermaid(
         neighbor_expr=neighbor_expr,
         neighbor_hops=neighbor_hops,
     )
+    return _write_mermaid(filtered, _diagram_edges(filtered), output_path, metrics)
 
-    lines = ["graph TD"]
-    id_map = {info.obj: _preferred_id(info.obj, info.obj_id) for info in filtered}
-    node_count = 0
-    edge_count = 0
-    filtered_objs = {info.obj for info in filtered}
-    xmi_id_map = { _xmi_id(info.obj): info.obj for info in filtered if _xmi_id(info.obj)}
-
-    def node_label(obj: EObject) -> str:
-        name = getattr(obj, "name", None)
-        return name if isinstance(name, str) and name else obj.eClass.name
-
-    for info in filtered:
-        node_id = id_map[info.obj].replace("-", "_")
-        label = node_label(info.obj).replace("\"", "'")
-        lines.append(f"  {node_id}[\"{label}\"]")
-        node_count += 1
-
-    for info in filtered:
-        src_id = id_map[info.obj].replace("-", "_")
-        for ref in _all_features(info.obj, "eAllReferences"):
-            value = info.obj.eGet(ref)
-            for target in _iter_values(value):
-                resolved = _resolve_filtered_target(target, filtered_objs, xmi_id_map)
-                if resolved is None:
-                    continue
-                dst_id = id_map[resolved].replace("-", "_")
-                lines.append(f"  {src_id} --> {dst_id}")
-                edge_count += 1
-
-    with open(output_path, "w", encoding="utf-8") as handle:
-        handle.write("\n".join(lines))
-        handle.write("\n")
 
-    result = {"nodes": node_count, "edges": edge_count}
-    if metrics:
-        result.update(metrics)
-    return result
+def _write_plantuml(
+    filtered: List[ObjectInfo],
+    edges: _DiagramEdges,
+    output_path: str,
+    metrics: dict[str, int] | None = None,
+    ids: List[str] | None = None,
+) -> dict[str, int]:
+    if ids is None:
+        ids = _diagram_ids(filtered)
+    with _open_output(output_path) as handle:
+        handle.write("@startuml\n")
+        for info, node_id in zip(filtered, ids):
+            label = _diagram_label(info.obj).replace("\"", "'")
+            handle.write(f'class "{label}" as {node_id}\n')
+        for src, dst in zip(*edges):
+            handle.write(f"{ids[src]} --> {ids[dst]}\n")
+        handle.write("@enduml\n")
+    return _diagram_result(len(filtered), len(edges[0]), metrics)
 
 
 def export_plantuml(
     roots: Iterable[EObject],
     output_path: str,
-    filter_expr: str | None = None,
-    neighbor_expr: str | None = None,
+    filter_expr: FilterExpr | None = None,
+    neighbor_expr: FilterExpr | None = None,
     neighbor_hops: int | None = None,
+    graph: ObjectGraph | None = None,
 ) -> dict[str, int]:
-    objects, _ = build_object_graph(roots)
+    objects, _ = graph or build_object_graph(roots, record_edges=False)
     filtered, metrics, _, _ = _apply_filter(
         objects,
         filter_expr,
@@ -991,55 +1670,36 @@ def export_plantuml(
         neighbor_expr=neighbor_expr,
         neighbor_hops=neighbor_hops,
     )
+    return _write_plantuml(filtered, _diagram_edges(filtered), output_path, metrics)
 
-    lines = ["@startuml"]
-    id_map = {info.obj: _preferred_id(info.obj, info.obj_id) for info in filtered}
-    node_count = 0
-    edge_count = 0
-    filtered_objs = {info.obj for info in filtered}
-    xmi_id_map = { _xmi_id(info.obj): info.obj for info in filtered if _xmi_id(info.obj)}
-
-    def node_label(obj: EObject) -> str:
-        name = getattr(obj, "name", None)
-        return name if isinstance(name, str) and name else obj.eClass.name
-
-    for info in filtered:
-        node_id = id_map[info.obj].replace("-", "_")
-        label = node_label(info.obj).replace("\"", "'")
-        lines.append(f'class "{label}" as {node_id}')
-        node_count += 1
-
-    for info in filtered:
-        src_id = id_map[info.obj].replace("-", "_")
-        for ref in _all_features(info.obj, "eAllReferences"):
-            value = info.obj.eGet(ref)
-            for target in _iter_values(value):
-                resolved = _resolve_filtered_target(target, filtered_objs, xmi_id_map)
-                if resolved is None:
-                    continue
-                dst_id = id_map[resolved].replace("-", "_")
-                lines.append(f"{src_id} --> {dst_id}")
-                edge_count += 1
 
-    lines.append("@enduml")
-    with open(output_path, "w", encoding="utf-8") as handle:
-        handle.write("\n".join(lines))
-        handle.write("\n")
-
-    result = {"nodes": node_count, "edges": edge_count}
-    if metrics:
-        result.update(metrics)
-    return result
+def _write_gml(
+    filtered: List[ObjectInfo],
+    edges: _DiagramEdges,
+    output_path: str,
+    metrics: dict[str, int] | None = None,
+) -> dict[str, int]:
+    with _open_output(output_path) as handle:
+        handle.write("graph [\n  directed 1\n")
+        # GML node ids are the positions in ``filtered``, as are edge endpoints.
+        for idx, info in enumerate(filtered):
+            label = _diagram_label(info.obj).replace("\"", "'")
+            handle.write(f"  node [\n    id {idx}\n    label \"{label}\"\n  ]\n")
+        for src, dst in zip(*edges):
+            handle.write(f"  edge [\n    source {src}\n    target {dst}\n  ]\n")
+        handle.write("]\n")
+    return _diagram_result(len(filtered), len(edges[0]), metrics)
 
 
 def export_gml(
     roots: Iterable[EObject],
     output_path: str,
-    filter_expr: str | None = None,
-    neighbor_expr: str | None = None,
+    filter_expr: FilterExpr | None = None,
+    neighbor_expr: FilterExpr | None = None,
     neighbor_hops: int | None = None,
+    graph: ObjectGraph | None = None,
 ) -> dict[str, int]:
-    objects, _ = build_object_graph(roots)
+    objects, _ = graph or build_object_graph(roots, record_edges=False)
     filtered, metrics, _, _ = _apply_filter(
         objects,
         filter_expr,
@@ -1049,52 +1709,124 @@ def export_gml(
         neighbor_expr=neighbor_expr,
         neighbor_hops=neighbor_hops,
     )
+    return _write_gml(filtered, _diagram_edges(filtered), output_path, metrics)
 
-    filtered_objs = [info.obj for info in filtered]
-    obj_to_idx = {obj: idx for idx, obj in enumerate(filtered_objs)}
-    filtered_set = set(filtered_objs)
-    xmi_id_map = { _xmi_id(obj): obj for obj in filtered_objs if _xmi_id(obj)}
 
-    def node_label(obj: EObject) -> str:
-        name = getattr(obj, "name", None)
-        return name if isinstance(name, str) and name else obj.eClass.name
+_DIAGRAM_KEYS = frozenset({"mermaid", "plantuml", "gml"})
 
-    lines = ["graph [", "  directed 1"]
-    node_count = 0
-    edge_count = 0
 
-    for obj in filtered_objs:
-        idx = obj_to_idx[obj]
-        label = node_label(obj).replace("\"", "'")
-        lines.append("  node [")
-        lines.append(f"    id {idx}")
-        lines.append(f"    label \"{label}\"")
-        lines.append("  ]")
-        node_count += 1
-
-    filtered_set = set(filtered_objs)
-    for src in filtered_objs:
-        for ref in _all_features(src, "eAllReferences"):
-            value = src.eGet(ref)
-            for target in _iter_values(value):
-                resolved = _resolve_filtered_target(target, filtered_set, xmi_id_map)
-                if resolved is None:
-                    continue
-                lines.append("  edge [")
-                lines.append(f"    source {obj_to_idx[src]}")
-                lines.append(f"    target {obj_to_idx[resolved]}")
-                lines.append("  ]")
-                edge_count += 1
+@dataclass
+class ExportPlan:
+    """Output paths for the instance exports produced by ``run_export_plan``."""
 
-    lines.append("]")
-    with open(output_path, "w", encoding="utf-8") as handle:
-        handle.write("\n".join(lines))
-        handle.write("\n")
+    mermaid: str | None = None
+    plantuml: str | None = None
+    gml: str | None = None
+    json: str | None = None
+    edges: str | None = None
+    paths: str | None = None
+    path_ids: str | None = None
 
-    result = {"nodes": node_count, "edges": edge_count}
-    if metrics:
-        result.update(metrics)
-    return result
+    @property
+    def wants_diagrams(self) -> bool:
+        return bool(self.mermaid or self.plantuml or self.gml)
+
+    @property
+    def wants_data(self) -> bool:
+        return bool(self.json or self.edges or self.paths or self.path_ids)
+
+
+def run_export_plan(
+    roots: Iterable[EObject],
+    plan: ExportPlan,
+    filter_expr: FilterExpr | None = None,
+    expand_expr: FilterExpr | None = None,
+    expand_depth: int | None = None,
+    expand_classes: AbstractSet[str] | None = None,
+    neighbor_expr: FilterExpr | None = None,
+    neighbor_hops: int | None = None,
+    max_workers: int = 1,
+    graph: ObjectGraph | None = None,
+    skip_defaults: bool = False,
+) -> dict[str, object]:
+    """Write every export in ``plan`` from a single graph walk.
+
+    The object graph, neighborhood expansion and filter/expansion selections
+    are computed once and shared by all requested writers; expressions may be
+    strings or predicates from ``compile_filter``. Diagram formats
+    (Mermaid, PlantUML, GML) ignore ``expand_expr`` like their standalone
+    exporters. Writers run one after another; ``max_workers > 1`` runs them
+    on a thread pool instead, which is opt-in because the formatting holds
+    the GIL and rarely overlaps. ``graph`` reuses a ``build_object_graph`` result for
+    ``roots``; it must include edges when ``plan.edges`` is set.
+    ``skip_defaults`` applies to the JSON export as in ``export_json``. Results
+    are keyed by plan field and match the return values of the corresponding
+    ``export_*`` functions.
+    """
+    results: dict[str, object] = {}
+    if not (plan.wants_diagrams or plan.wants_data):
+        return results
+
+    filter_expr = compile_filter(filter_expr)
+    expand_expr = compile_filter(expand_expr)
+    neighbor_expr = compile_filter(neighbor_expr)
+    if graph is None:
+        graph = build_object_graph(roots, record_edges=bool(plan.edges))
+    objects, containment_edges = graph
+    objects, neighbor_metrics = _neighbor_stage(objects, neighbor_expr, neighbor_hops)
+
+    jobs: List[tuple[str, Callable[[], object]]] = []
+    if plan.wants_diagrams:
+        filtered, diagram_metrics, _, _ = _select(
+            objects, neighbor_metrics, filter_expr, None, None, None
+        )
+        edges = _diagram_edges(filtered)
+        diagram_ids = _diagram_ids(filtered) if plan.mermaid or plan.plantuml else None
+        for key, writer in (
+            ("mermaid", partial(_write_mermaid, ids=diagram_ids)),
+            ("plantuml", partial(_write_plantuml, ids=diagram_ids)),
+            ("gml", _write_gml),
+        ):
+            output_path = getattr(plan, key)
+            if output_path:
+                jobs.append((key, partial(writer, filtered, edges, output_path, diagram_metrics)))
+
+    data_metrics = None
+    if plan.wants_data:
+        if plan.wants_diagrams and not expand_expr:
+            selected, data_metrics, path_map, id_path_map = filtered, diagram_metrics, None, None
+        else:
+            selected, data_metrics, path_map, id_path_map = _select(
+                objects, neighbor_metrics, filter_expr, expand_expr, expand_depth, expand_classes
+            )
+        # The JSON and edges writers resolve references through the same ids.
+        id_map = _preferred_id_map(selected) if plan.json or plan.edges else None
+        if plan.json:
+            jobs.append(
+                ("json", partial(_write_json_entries, selected, plan.json, id_map, skip_defaults))
+            )
+        if plan.edges:
+            jobs.append(
+                ("edges", partial(_write_edges, selected, containment_edges, plan.edges, id_map))
+            )
+        if plan.paths:
+            jobs.append(("paths", partial(_write_paths, selected, path_map, plan.paths)))
+        if plan.path_ids:
+            jobs.append(("path_ids", partial(_write_path_ids, selected, id_path_map, plan.path_ids)))
+
+    # Writers only read the shared selections and each owns its output file;
+    # the lazily filled path and feature caches they share store the same
+    # value whichever thread fills them first.
+    if len(jobs) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            futures = [(key, executor.submit(job)) for key, job in jobs]
+            outputs = [(key, future.result()) for key, future in futures]
+    else:
+        outputs = [(key, job()) for key, job in jobs]
+
+    for key, output in outputs:
+        results[key] = output if key in _DIAGRAM_KEYS else (output, data_metrics)
+    return results
 
 
 def _collect_supertypes(classes: Iterable[object]) -> set[str]:
@@ -1109,31 +1841,32 @@ def _collect_supertypes(classes: Iterable[object]) -> set[str]:
 
 def _select_objects(
     instance_resource: XMIResource,
-    include_classes: set[str] | None,
-    exclude_classes: set[str] | None,
+    include_classes: AbstractSet[str] | None,
+    exclude_classes: AbstractSet[str] | None,
     include_supertypes: bool = False,
 ) -> tuple[list[EObject], set[EObject], set[str]]:
-    objects, _ = build_object_graph(instance_resource.contents)
+    index = class_index(instance_resource)
     include_classes = include_classes or set()
     exclude_classes = exclude_classes or set()
     expanded_include = set(include_classes)
     if include_supertypes and include_classes:
-        class_objs = {info.obj.eClass for info in objects if info.obj.eClass.name in include_classes}
+        class_objs = {
+            obj.eClass for name in include_classes for obj in index.get(name, ())
+        }
         expanded_include.update(_collect_supertypes(class_objs))
+    names = expanded_include if expanded_include else index.keys()
     selected: set[EObject] = set()
-    for info in objects:
-        cls_name = info.obj.eClass.name
-        if expanded_include and cls_name not in expanded_include:
+    for name in names:
+        if name in exclude_classes:
             continue
-        if exclude_classes and cls_name in exclude_classes:
-            continue
-        selected.add(info.obj)
-    return [info.obj for info in objects], selected, expanded_include
+        selected.update(index.get(name, ()))
+    all_objects = [obj for objs in index.values() for obj in objs]
+    return all_objects, selected, expanded_include
 
 
 def _add_container_ancestors(selected: set[EObject]) -> set[EObject]:
     expanded = set(selected)
-    for obj in list(selected):
+    for obj in selected:
         parent = obj.eContainer()
         while parent is not None and parent not in expanded:
             expanded.add(parent)
@@ -1141,83 +1874,147 @@ def _add_container_ancestors(selected: set[EObject]) -> set[EObject]:
     return expanded
 
 
-def preview_filtered_instance(
+@dataclass
+class PruneSelection:
+    """Objects kept by an instance prune, shared by its preview and export."""
+
+    all_objects: List[EObject]
+    selected: set[EObject]
+    include_classes: set[str]
+    include_classes_added: set[str]
+    added_containers: set[EObject]
+    stats: dict[str, object] | None = None
+    pruned_objects: set[EObject] | None = None
+    root_objects: List[EObject] | None = None
+
+    def pruned(self) -> set[EObject]:
+        """Objects dropped by the prune, computed on first use and then shared."""
+        if self.pruned_objects is None:
+            selected = self.selected
+            self.pruned_objects = {obj for obj in self.all_objects if obj not in selected}
+        return self.pruned_objects
+
+    def roots(self) -> List[EObject]:
+        """Selected objects whose container is not selected, i.e. the saved roots."""
+        if self.root_objects is None:
+            selected = self.selected
+            self.root_objects = [obj for obj in selected if obj.eContainer() not in selected]
+        return self.root_objects
+
+
+def select_prune(
     instance_resource: XMIResource,
-    include_classes: set[str] | None = None,
-    exclude_classes: set[str] | None = None,
+    include_classes: AbstractSet[str] | None = None,
+    exclude_classes: AbstractSet[str] | None = None,
     include_supertypes: bool = False,
     include_containers: bool = True,
-) -> dict[str, object]:
+) -> PruneSelection:
+    """Compute the objects kept by ``export_filtered_instance`` without writing.
+
+    Pass the result as ``selection=`` to ``preview_filtered_instance`` and
+    ``export_filtered_instance`` (with the same class options) to skip
+    recomputing it; the preview statistics are cached on it as well.
+    """
     all_objects, selected, expanded_include = _select_objects(
         instance_resource,
         include_classes,
         exclude_classes,
         include_supertypes=include_supertypes,
     )
-    selected_set = set(selected)
-    added_container_objects: set[EObject] = set()
+    # ``_select_objects`` returns a fresh set, so it can be kept as is.
+    selected_set = selected
+    added_containers: set[EObject] = set()
     if include_containers:
         expanded = _add_container_ancestors(selected_set)
-        added_container_objects = expanded - selected_set
+        added_containers = expanded - selected_set
         selected_set = expanded
-    pruned_set = set(all_objects) - selected_set
+    return PruneSelection(
+        all_objects=all_objects,
+        selected=selected_set,
+        include_classes=expanded_include,
+        include_classes_added=expanded_include - set(include_classes or ()),
+        added_containers=added_containers,
+    )
+
+
+def preview_filtered_instance(
+    instance_resource: XMIResource,
+    include_classes: AbstractSet[str] | None = None,
+    exclude_classes: AbstractSet[str] | None = None,
+    include_supertypes: bool = False,
+    include_containers: bool = True,
+    selection: PruneSelection | None = None,
+) -> dict[str, object]:
+    if selection is None:
+        selection = select_prune(
+            instance_resource,
+            include_classes,
+            exclude_classes,
+            include_supertypes=include_supertypes,
+            include_containers=include_containers,
+        )
+    if selection.stats is not None:
+        return dict(selection.stats)
+    all_objects = selection.all_objects
+    selected_set = selection.selected
+    pruned_set = selection.pruned()
 
     def _class_counts(objs: Iterable[EObject]) -> Dict[str, int]:
-        counts: Dict[str, int] = {}
-        for obj in objs:
-            name = obj.eClass.name
-            counts[name] = counts.get(name, 0) + 1
-        return dict(sorted(counts.items()))
+        return dict(sorted(Counter(_class_name(obj) for obj in objs).items()))
 
     def _class_names(objs: Iterable[EObject]) -> List[str]:
         names = {obj.eClass.name for obj in objs}
         return sorted(names)
 
     containment_edges = 0
-    containment_by_feature: Dict[str, int] = {}
+    containment_by_feature: Counter[str] = Counter()
     reference_edges = 0
-    reference_by_feature: Dict[str, int] = {}
+    reference_by_feature: Counter[str] = Counter()
     for obj in selected_set:
-        for ref in _containment_features(obj):
-            value = obj.eGet(ref)
-            for target in _iter_values(value):
+        features = _class_features(obj.eClass)
+        if not features["all_reference_names"]:
+            continue
+        for name, many in zip(features["containment_names"], features["containment_many"]):
+            value = getattr(obj, name)
+            if value is None:
+                continue
+            for target in _iter_many(value) if many else _iter_single(value):
                 if target in pruned_set:
                     containment_edges += 1
-                    containment_by_feature[ref.name] = containment_by_feature.get(ref.name, 0) + 1
-        for ref in _all_features(obj, "eAllReferences"):
-            if getattr(ref, "containment", False):
+                    containment_by_feature[name] += 1
+        for name, many in zip(features["reference_names"], features["reference_many"]):
+            value = getattr(obj, name)
+            if value is None:
                 continue
-            value = obj.eGet(ref)
-            for target in _iter_values(value):
+            for target in _iter_many(value) if many else _iter_single(value):
                 if target in pruned_set:
                     reference_edges += 1
-                    reference_by_feature[ref.name] = reference_by_feature.get(ref.name, 0) + 1
+                    reference_by_feature[name] += 1
 
-    roots = [obj for obj in selected_set if obj.eContainer() not in selected_set]
-
-    return {
+    selection.stats = {
         "total_objects": len(all_objects),
         "selected_objects": len(selected_set),
         "pruned_objects": len(pruned_set),
         "selected_classes": _class_counts(selected_set),
         "pruned_classes": _class_counts(pruned_set),
         "pruned_class_names": _class_names(pruned_set),
-        "include_classes": sorted(expanded_include),
-        "include_classes_added": sorted(set(expanded_include) - set(include_classes or [])),
-        "container_classes_added": _class_names(added_container_objects),
+        "include_classes": sorted(selection.include_classes),
+        "include_classes_added": sorted(selection.include_classes_added),
+        "container_classes_added": _class_names(selection.added_containers),
         "pruned_containment_edges": containment_edges,
         "pruned_containment_features": dict(sorted(containment_by_feature.items())),
         "pruned_reference_edges": reference_edges,
         "pruned_reference_features": dict(sorted(reference_by_feature.items())),
-        "roots": len(roots),
+        "roots": len(selection.roots()),
     }
+    return dict(selection.stats)
 
 
 def export_filtered_instance(
     instance_resource: XMIResource,
     output_path: str,
-    include_classes: set[str] | None = None,
-    exclude_classes: set[str] | None = None,
+    include_classes: AbstractSet[str] | None = None,
+    exclude_classes: AbstractSet[str] | None = None,
     dry_run: bool = False,
     strip_pruned_references: bool = False,
     include_supertypes: bool = False,
@@ -1225,24 +2022,20 @@ def export_filtered_instance(
     include_containers: bool = True,
     debug_attrs: bool = False,
     debug_defaults: bool = False,
+    selection: PruneSelection | None = None,
 ) -> dict[str, object]:
-    all_objects, selected, expanded_include = _select_objects(
-        instance_resource,
-        include_classes,
-        exclude_classes,
-        include_supertypes=include_supertypes,
-    )
-    selected_set = set(selected)
-    if include_containers:
-        selected_set = _add_container_ancestors(selected_set)
+    if selection is None:
+        selection = select_prune(
+            instance_resource,
+            include_classes,
+            exclude_classes,
+            include_supertypes=include_supertypes,
+            include_containers=include_containers,
+        )
+    all_objects = selection.all_objects
+    selected_set = selection.selected
 
-    stats = preview_filtered_instance(
-        instance_resource,
-        include_classes=include_classes,
-        exclude_classes=exclude_classes,
-        include_supertypes=include_supertypes,
-        include_containers=include_containers,
-    )
+    stats = preview_filtered_instance(instance_resource, selection=selection)
     if dry_run:
         return stats
 
@@ -1255,7 +2048,7 @@ def export_filtered_instance(
     out_res = rset.create_resource(URI(output_path))
     out_res.use_uuid = True
 
-    roots = [obj for obj in selected_set if obj.eContainer() not in selected_set]
+    roots = selection.roots()
 
     if hasattr(instance_resource, "get_id"):
         for obj in selected_set:
@@ -1361,15 +2154,16 @@ def export_filtered_instance(
 
     original_values: List[tuple[EObject, object, object]] = []
     if strip_pruned_references:
-        pruned_set = set(all_objects) - selected_set
+        pruned_set = selection.pruned()
         for obj in selected_set:
             for ref in _all_features(obj, "eAllReferences"):
                 value = obj.eGet(ref)
                 if value is None:
                     continue
                 if ref.many:
-                    kept = [v for v in _iter_values(value) if v not in pruned_set]
-                    if len(kept) != len(list(_iter_values(value))):
+                    targets = _iter_many(value)
+                    kept = [v for v in targets if v not in pruned_set]
+                    if len(kept) != len(targets):
                         original_values.append((obj, ref, value))
                         obj.eSet(ref, kept)
                 else:
@@ -1377,8 +2171,7 @@ def export_filtered_instance(
                         original_values.append((obj, ref, value))
                         obj.eSet(ref, None)
 
-    for obj in roots:
-        out_res.append(obj)
+    out_res.extend(roots)
 
     if serialize_defaults:
         out_res.save(options={XMIOptions.SERIALIZE_DEFAULT_VALUES: True})
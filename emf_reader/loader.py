@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Iterable, List, Tuple
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
 
-from pyecore.ecore import EPackage
+from pyecore.ecore import EObject, EPackage
 from pyecore.resources import ResourceSet, URI
 from pyecore.resources.xmi import XMIResource
 
@@ -21,10 +25,12 @@ def _configure_resource_set() -> ResourceSet:
 
 
 def _iter_packages(pkgs: Iterable[EPackage]) -> Iterable[EPackage]:
-    for pkg in pkgs:
+    """Yield ``pkgs`` and their subpackages in preorder."""
+    stack = list(reversed(list(pkgs)))
+    while stack:
+        pkg = stack.pop()
         yield pkg
-        for sub in pkg.eSubpackages:
-            yield from _iter_packages([sub])
+        stack.extend(reversed(list(pkg.eSubpackages)))
 
 
 def load_metamodel(ecore_path: str, rset: ResourceSet | None = None) -> Tuple[ResourceSet, List[EPackage]]:
@@ -41,12 +47,36 @@ def load_metamodel(ecore_path: str, rset: ResourceSet | None = None) -> Tuple[Re
     return rset, packages
 
 
-def load_instance(instance_path: str, rset: ResourceSet) -> XMIResource:
+def load_instance(
+    instance_path: str, rset: ResourceSet, options: dict | None = None
+) -> XMIResource:
+    """Load an instance resource, passing ``options`` to the XMI loader.
+
+    pyecore's XMI loader already defers IDREF resolution: references are
+    collected while parsing and resolved in one pass against the resource's
+    id index once the whole document is loaded, so forward references do not
+    trigger rescans.
+    """
     LOGGER.info("Loading instance: %s", instance_path)
-    resource = rset.get_resource(URI(instance_path))
+    resource = rset.get_resource(URI(instance_path), options=options)
     return resource
 
 
+def class_index(resource: XMIResource) -> Dict[str, List[EObject]]:
+    """Return instances of ``resource`` grouped by EClass name.
+
+    The index is built with one containment walk on every call, so it always
+    reflects the current contents; keep the result to reuse it.
+    """
+    index: Dict[str, List[EObject]] = {}
+    stack = list(reversed(resource.contents))
+    while stack:
+        obj = stack.pop()
+        index.setdefault(obj.eClass.name, []).append(obj)
+        stack.extend(reversed(obj.eContents))
+    return index
+
+
 def _all_classifiers(pkg: EPackage):
     return list(pkg.eClassifiers)
 
@@ -160,6 +190,117 @@ def metamodel_dump(packages: Iterable[EPackage]) -> dict[str, object]:
     return data
 
 
+_INDEX_CACHE_VERSION = b"metamodel-index-3"
+
+
+def _cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "emf_reader"
+
+
+def _file_signature(path: str) -> Tuple[str, int, int]:
+    resolved = os.path.realpath(path)
+    stat = os.stat(resolved)
+    return resolved, stat.st_mtime_ns, stat.st_size
+
+
+def _index_cache_path(ecore_path: str) -> Path:
+    # Keyed on path, mtime and size so a warm lookup starts with one stat call.
+    key = ":".join(map(str, _file_signature(ecore_path))).encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=20)
+    digest.update(_INDEX_CACHE_VERSION)
+    return _cache_dir() / f"{digest.hexdigest()}.pkl"
+
+
+def _resource_signatures(rset: ResourceSet) -> List[Tuple[str, int, int]]:
+    """Signatures of every file loaded into ``rset``, referenced .ecore files included."""
+    signatures = set()
+    for resource in list(rset.resources.values()):
+        path = getattr(resource.uri, "plain", None)
+        if path and os.path.isfile(path):
+            signatures.add(_file_signature(path))
+    return sorted(signatures)
+
+
+def _signatures_match(signatures: Iterable[Tuple[str, int, int]]) -> bool:
+    try:
+        return all(_file_signature(path) == (path, mtime, size) for path, mtime, size in signatures)
+    except OSError:
+        return False
+
+
+def load_metamodel_index(ecore_path: str, use_cache: bool = True) -> dict[str, object]:
+    """Return the ``metamodel_dump`` payload for ``ecore_path``, cached on disk.
+
+    pyecore objects cannot be pickled, so the cache stores the plain-data
+    dump under ``$XDG_CACHE_HOME/emf_reader`` (``~/.cache/emf_reader`` by
+    default), keyed by the file's resolved path, modification time and size.
+    The entry also records the path, modification time and size of every
+    file the parse loaded, such as .ecore files referenced through hrefs, and
+    is rebuilt when any of them changed. Pass ``use_cache=False`` to parse the
+    file without touching the cache.
+    """
+    if not use_cache:
+        _, packages = load_metamodel(ecore_path)
+        return metamodel_dump(packages)
+    cache_path = _index_cache_path(ecore_path)
+    try:
+        with open(cache_path, "rb") as handle:
+            sources, index = pickle.load(handle)
+        if _signatures_match(sources):
+            LOGGER.info("Loaded metamodel index from cache: %s", cache_path)
+            return index
+        LOGGER.info("Metamodel cache is stale, a referenced file changed: %s", cache_path)
+    except FileNotFoundError:
+        pass
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.warning("Ignoring unreadable metamodel cache %s: %s", cache_path, exc)
+    rset, packages = load_metamodel(ecore_path)
+    index = metamodel_dump(packages)
+    # After the dump, so files loaded while resolving proxies are included.
+    sources = _resource_signatures(rset)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as handle:
+            pickle.dump((sources, index), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        LOGGER.warning("Could not write metamodel cache %s: %s", cache_path, exc)
+    return index
+
+
+def metamodel_index_stats(index: dict[str, object]) -> dict[str, int]:
+    """``metamodel_stats`` computed from a ``metamodel_dump`` payload."""
+    packages = index["packages"]
+    classes = [cls for pkg in packages for cls in pkg["classes"]]
+    return {
+        "packages": len(packages),
+        "classes": len(classes),
+        "attributes": sum(len(cls["attributes"]) for cls in classes),
+        "references": sum(len(cls["references"]) for cls in classes),
+    }
+
+
+def summarize_metamodel_index(index: dict[str, object]) -> str:
+    """``summarize_metamodel`` rendered from a ``metamodel_dump`` payload."""
+    lines: List[str] = []
+    total_classes = 0
+    for pkg in index["packages"]:
+        lines.append(f"Package: {pkg['name']} nsURI={pkg['nsURI']}")
+        for cls in pkg["classes"]:
+            total_classes += 1
+            attrs = [a["name"] for a in cls["attributes"]]
+            refs = [r["name"] for r in cls["references"]]
+            lines.append(f"  Class: {cls['name']} attrs={len(attrs)} refs={len(refs)}")
+            if attrs:
+                lines.append(f"    Attributes: {', '.join(attrs)}")
+            if refs:
+                lines.append(f"    References: {', '.join(refs)}")
+    lines.append(f"Total classes: {total_classes}")
+    return "\n".join(lines)
+
+
 def summarize_instances(resources: Iterable[XMIResource]) -> str:
     roots = [obj for res in resources for obj in res.contents]
     lines = [f"Root objects: {len(roots)}"]
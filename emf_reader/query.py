@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import ast
-from typing import Any, Callable, Dict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple
+from weakref import WeakKeyDictionary
 
 from pyecore.ecore import EObject
 
@@ -43,10 +45,17 @@ _ALLOWED_OPS = (
     ast.NotIn,
 )
 
+Predicate = Callable[[Dict[str, Any]], bool]
+FilterExpr = str | Predicate
+
+
+# Value types ``_json_safe`` passes through without further checks.
+_JSON_SAFE_TYPES = frozenset((str, int, float, bool, type(None)))
+
 
 def _json_safe(value: object) -> object:
-    if value is None:
-        return None
+    if type(value) in _JSON_SAFE_TYPES:
+        return value
     if isinstance(value, (str, int, float, bool)):
         return value
     if isinstance(value, bytes):
@@ -59,35 +68,50 @@ def _json_safe(value: object) -> object:
     return str(value)
 
 
-def _all_features(obj: EObject, name: str):
-    attr = getattr(obj.eClass, name, [])
+# Per-EClass ``(attributes, supertype names)``; contexts for instances of one
+# class share a single reflective walk.
+_CLASS_CACHE: WeakKeyDictionary[object, Tuple[tuple, frozenset[str]]] = WeakKeyDictionary()
+
+
+def _all_features(eclass, name: str):
+    attr = getattr(eclass, name, [])
     return attr() if callable(attr) else list(attr)
 
 
+def _class_info(eclass) -> Tuple[tuple, frozenset[str]]:
+    info = _CLASS_CACHE.get(eclass)
+    if info is None:
+        attrs = tuple(
+            (attr, attr.name, bool(attr.many)) for attr in _all_features(eclass, "eAllAttributes")
+        )
+        kinds = frozenset(sup.name for sup in eclass.eAllSuperTypes()) | {eclass.name}
+        info = _CLASS_CACHE[eclass] = (attrs, kinds)
+    return info
+
+
 def build_context(obj: EObject, obj_id: str, path: str) -> Dict[str, Any]:
+    eclass = obj.eClass
+    class_attrs, kinds = _class_info(eclass)
     attrs: Dict[str, Any] = {}
-    for attr in _all_features(obj, "eAllAttributes"):
+    for attr, name, many in class_attrs:
         value = obj.eGet(attr)
-        if attr.many:
-            attrs[attr.name] = _json_safe(list(value)) if value is not None else []
+        if many:
+            attrs[name] = [_json_safe(v) for v in value] if value is not None else []
         else:
-            attrs[attr.name] = _json_safe(value)
+            attrs[name] = _json_safe(value)
     internal_id = getattr(obj, "_internal_id", None)
     preferred_id = internal_id if isinstance(internal_id, str) and internal_id else obj_id
+    class_name = eclass.name
+
     def is_class(name: str) -> bool:
-        return obj.eClass.name == name
+        return class_name == name
 
     def is_kind_of(name: str) -> bool:
-        if obj.eClass.name == name:
-            return True
-        for sup in obj.eClass.eAllSuperTypes():
-            if sup.name == name:
-                return True
-        return False
+        return name in kinds
 
     ctx: Dict[str, Any] = {
-        "eclass": obj.eClass.name,
-        "nsuri": obj.eClass.ePackage.nsURI if obj.eClass.ePackage else None,
+        "eclass": class_name,
+        "nsuri": eclass.ePackage.nsURI if eclass.ePackage else None,
         "id": preferred_id,
         "local_id": obj_id,
         "ID": preferred_id,
@@ -105,6 +129,20 @@ def build_context(obj: EObject, obj_id: str, path: str) -> Dict[str, Any]:
     return ctx
 
 
+# Context names a ``class_names`` shortcut stands in for.
+_CLASS_TEST_NAMES = frozenset(("eclass", "is_class"))
+
+
+def class_test_applies(eclass) -> bool:
+    """Whether ``predicate.class_names`` may replace evaluation for ``eclass``.
+
+    ``build_context`` adds attributes last, so an attribute named ``eclass``
+    or ``is_class`` shadows the class test; such classes need the full path.
+    """
+    class_attrs, _ = _class_info(eclass)
+    return not any(name in _CLASS_TEST_NAMES for _, name, _ in class_attrs)
+
+
 def _validate_expr(tree: ast.AST) -> None:
     for node in ast.walk(tree):
         if not isinstance(node, _ALLOWED_NODES + _ALLOWED_OPS):
@@ -120,7 +158,63 @@ def _validate_expr(tree: ast.AST) -> None:
                 raise ValueError("Keyword arguments are not supported")
 
 
-def build_predicate(expr: str) -> Callable[[Dict[str, Any]], bool]:
+def _str_constant(node: ast.AST) -> frozenset[str] | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return frozenset((node.value,))
+    return None
+
+
+def _str_collection(node: ast.AST) -> frozenset[str] | None:
+    # Only literal collections: ``eclass in 'Doc'`` is a substring test.
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        values = [elt.value for elt in node.elts if isinstance(elt, ast.Constant)]
+        if len(values) == len(node.elts) and all(isinstance(v, str) for v in values):
+            return frozenset(values)
+    return None
+
+
+def _class_names(node: ast.AST) -> frozenset[str] | None:
+    """Return the EClass names matched by a pure class-name test, else ``None``.
+
+    Recognizes ``is_class('X')``, ``eclass == 'X'``, ``eclass in [...]`` and
+    ``or`` combinations of them.
+    """
+    if isinstance(node, ast.Expression):
+        return _class_names(node.body)
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.Or):
+        names: set[str] = set()
+        for value in node.values:
+            sub = _class_names(value)
+            if sub is None:
+                return None
+            names.update(sub)
+        return frozenset(names)
+    if isinstance(node, ast.Call):
+        if node.func.id == "is_class" and len(node.args) == 1:
+            return _str_constant(node.args[0])
+        return None
+    if (
+        isinstance(node, ast.Compare)
+        and len(node.ops) == 1
+        and isinstance(node.left, ast.Name)
+        and node.left.id == "eclass"
+    ):
+        if isinstance(node.ops[0], ast.Eq):
+            return _str_constant(node.comparators[0])
+        if isinstance(node.ops[0], ast.In):
+            return _str_collection(node.comparators[0])
+    return None
+
+
+@lru_cache(maxsize=256)
+def build_predicate(expr: str) -> Predicate:
+    """Compile ``expr`` into a predicate over a ``build_context`` mapping.
+
+    Pure class-name tests also get a ``class_names`` frozenset attribute, so
+    callers can match on ``obj.eClass.name`` without building a context, for
+    classes where ``class_test_applies`` holds. Predicates are cached by
+    expression text; they hold no per-call state.
+    """
     tree = ast.parse(expr, mode="eval")
     _validate_expr(tree)
     code = compile(tree, "<filter>", "eval")
@@ -128,4 +222,14 @@ def build_predicate(expr: str) -> Callable[[Dict[str, Any]], bool]:
     def predicate(ctx: Dict[str, Any]) -> bool:
         return bool(eval(code, {"__builtins__": {}}, ctx))
 
+    predicate.class_names = _class_names(tree)
     return predicate
+
+
+def compile_filter(expr: FilterExpr | None) -> Predicate | None:
+    """Compile ``expr`` once; already-compiled predicates pass through unchanged."""
+    if not expr:
+        return None
+    if callable(expr):
+        return expr
+    return build_predicate(expr)
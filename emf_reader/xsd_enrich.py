@@ -7,8 +7,7 @@ from typing import Dict, Iterable, List, Tuple
 
 from lxml import etree
 
-from .export import build_object_graph
-from .loader import _all_features
+from .export import build_object_graph, class_containments, class_references
 from .loader import load_instance, load_metamodel
 
 LOGGER = logging.getLogger(__name__)
@@ -89,7 +88,7 @@ def _collect_objects_with_references(roots: Iterable[object]) -> list[object]:
         if obj in seen:
             continue
         seen.add(obj)
-        for ref in _all_features(obj, "eAllReferences"):
+        for ref in class_references(obj.eClass):
             try:
                 value = obj.eGet(ref)
             except Exception:  # noqa: BLE001
@@ -125,11 +124,11 @@ def _find_parent_complex_type(elem: etree._Element) -> str | None:
 
 def _children_by_xml_tag(parent_obj: object, xml_tag: str) -> list[object]:
     matches: list[object] = []
-    for ref in _all_features(parent_obj, "eAllContainments"):
+    for ref in class_containments(parent_obj.eClass):
         value = parent_obj.eGet(ref)
         if value is None:
             continue
-        items = list(value) if ref.many else [value]
+        items = value if ref.many else (value,)
         for child in items:
             if child.eClass.name not in {"MessageElement", "MessageAttribute"}:
                 continue
@@ -205,7 +204,7 @@ def enrich_xsd(
     rset, _ = load_metamodel(ecore_path)
     instance_resource = load_instance(instance_path, rset)
 
-    objects, _ = build_object_graph(instance_resource.contents)
+    objects, _ = build_object_graph(instance_resource.contents, record_edges=False)
     containment_objects = [info.obj for info in objects]
     model_objects = _collect_objects_with_references(containment_objects)
     id_index = { _get_xmi_id(obj): obj for obj in model_objects if _get_xmi_id(obj)}
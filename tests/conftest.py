@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+
+_ECORE_TYPE = "ecore:EDataType http://www.eclipse.org/emf/2002/Ecore#//EString"
+
+MINI_ECORE = f"""<?xml version="1.0" encoding="UTF-8"?>
+<ecore:EPackage xmi:version="2.0" xmlns:xmi="http://www.omg.org/XMI"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:ecore="http://www.eclipse.org/emf/2002/Ecore" name="mini" nsURI="urn:mini" nsPrefix="mini">
+  <eClassifiers xsi:type="ecore:EClass" name="Repository">
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="name" eType="{_ECORE_TYPE}"/>
+    <eStructuralFeatures xsi:type="ecore:EReference" name="components" upperBound="-1"
+        eType="#//BusinessComponent" containment="true"/>
+  </eClassifiers>
+  <eClassifiers xsi:type="ecore:EClass" name="BusinessComponent">
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="name" eType="{_ECORE_TYPE}"/>
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="definition" eType="{_ECORE_TYPE}"/>
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="status" eType="{_ECORE_TYPE}"
+        defaultValueLiteral="Provisionally"/>
+    <eStructuralFeatures xsi:type="ecore:EReference" name="elements" upperBound="-1"
+        eType="#//BusinessElement" containment="true"/>
+    <eStructuralFeatures xsi:type="ecore:EReference" name="related" upperBound="-1"
+        eType="#//BusinessComponent"/>
+  </eClassifiers>
+  <eClassifiers xsi:type="ecore:EClass" name="BusinessElement">
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="name" eType="{_ECORE_TYPE}"/>
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="xmlTag" eType="{_ECORE_TYPE}"/>
+    <eStructuralFeatures xsi:type="ecore:EReference" name="type" eType="#//BusinessComponent"/>
+  </eClassifiers>
+</ecore:EPackage>
+"""
+
+# Two components that reference each other, one contained element with a
+# cross reference, and one component left at its ``status`` default.
+MINI_INSTANCE = """<?xml version="1.0" encoding="UTF-8"?>
+<mini:Repository xmi:version="2.0" xmlns:xmi="http://www.omg.org/XMI" xmlns:mini="urn:mini"
+    xmi:id="_repo" name="Repo">
+  <components xmi:id="_account" name="Account" definition="An account" related="_party">
+    <elements xmi:id="_owner" name="Owner" xmlTag="Ownr" type="_party"/>
+  </components>
+  <components xmi:id="_party" name="Party" status="Obsolete" related="_account"/>
+</mini:Repository>
+"""
+
+
+@pytest.fixture
+def mini_model(tmp_path: Path) -> tuple[str, str]:
+    """Write the inline metamodel and instance; return ``(ecore, instance)`` paths."""
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    ecore = model_dir / "mini.ecore"
+    instance = model_dir / "mini.xmi"
+    ecore.write_text(MINI_ECORE, encoding="utf-8")
+    instance.write_text(MINI_INSTANCE, encoding="utf-8")
+    return str(ecore), str(instance)
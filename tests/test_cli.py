@@ -1,9 +1,11 @@
+import json
 import os
 from pathlib import Path
 
 import pytest
 
 from emf_reader import cli as emf_cli
+from emf_reader import loader
 from emf_reader import xsd_enrich_cli
 
 ECORE = "/var/software/input/ISO20022.ecore"
@@ -31,6 +33,48 @@ def test_cli_dump_metamodel_json(tmp_path):
     assert out.stat().st_size > 0
 
 
+def test_cli_dump_metamodel_json_cached(tmp_path, monkeypatch, mini_model):
+    ecore, _ = mini_model
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    first = tmp_path / "first.json"
+    second = tmp_path / "second.json"
+    assert emf_cli.main(["--ecore", ecore, "--dump-metamodel-json", str(first)]) == 0
+    cache_files = list((tmp_path / "cache" / "emf_reader").glob("*.pkl"))
+    assert len(cache_files) == 1
+
+    def _no_parse(*args, **kwargs):
+        raise AssertionError("metamodel parsed despite a warm cache")
+
+    # A warm run must be served from the cache file without parsing the .ecore.
+    monkeypatch.setattr(loader, "load_metamodel", _no_parse)
+    assert emf_cli.main(["--ecore", ecore, "--dump-metamodel-json", str(second)]) == 0
+    assert list((tmp_path / "cache" / "emf_reader").glob("*.pkl")) == cache_files
+    payload = json.loads(first.read_text(encoding="utf-8"))
+    assert payload == json.loads(second.read_text(encoding="utf-8"))
+    assert payload["total_classes"] == 3
+
+
+def test_cli_dump_metamodel_json_no_cache(tmp_path, monkeypatch, mini_model):
+    ecore, _ = mini_model
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    out = tmp_path / "metamodel.json"
+    assert emf_cli.main(["--ecore", ecore, "--dump-metamodel-json", str(out), "--no-cache"]) == 0
+    assert json.loads(out.read_text(encoding="utf-8"))["total_classes"] == 3
+    assert not (tmp_path / "cache").exists()
+
+
+def test_cli_no_cache_ignores_existing_cache(tmp_path, monkeypatch, mini_model):
+    ecore, _ = mini_model
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    assert emf_cli.main(["--ecore", ecore, "--dump-metamodel-json", str(tmp_path / "warm.json")]) == 0
+    [cache_file] = (tmp_path / "cache" / "emf_reader").glob("*.pkl")
+    cache_file.write_bytes(b"not a pickle")
+    out = tmp_path / "metamodel.json"
+    assert emf_cli.main(["--ecore", ecore, "--dump-metamodel-json", str(out), "--no-cache"]) == 0
+    assert json.loads(out.read_text(encoding="utf-8"))["total_classes"] == 3
+    assert cache_file.read_bytes() == b"not a pickle"
+
+
 def test_cli_dump_model_json(tmp_path):
     _skip_if_missing(ECORE, INSTANCE)
     out = tmp_path / "model.json"
@@ -47,6 +91,60 @@ def test_cli_dump_model_json(tmp_path):
     assert out.stat().st_size > 0
 
 
+def test_cli_dump_instances_json(tmp_path, mini_model):
+    ecore, instance = mini_model
+    out = tmp_path / "instances.json"
+    code = emf_cli.main([
+        "--ecore",
+        ecore,
+        "--instance",
+        instance,
+        "--dump-instances-json",
+        str(out),
+        "--dump-instances-filter",
+        "eclass == 'BusinessComponent'",
+    ])
+    assert code == 0
+    payload = json.loads(out.read_text(encoding="utf-8"))
+    assert payload["total_objects"] == 4
+    assert list(payload["classes"]) == ["BusinessComponent"]
+    components = payload["classes"]["BusinessComponent"]
+    assert [entry["id"] for entry in components] == ["_account", "_party"]
+    assert components[0]["containment"] == ["_owner"]
+    assert components[0]["references"] == {"related": ["_party"]}
+
+
+@pytest.mark.parametrize("workers", [[], ["--export-workers", "4"]])
+def test_cli_fused_exports(tmp_path, mini_model, workers):
+    ecore, instance = mini_model
+    outputs = {
+        "--export-mermaid": tmp_path / "graph.mmd",
+        "--export-gml": tmp_path / "graph.gml",
+        "--export-json": tmp_path / "objects.json",
+        "--export-edges": tmp_path / "edges.csv",
+    }
+    argv = ["--ecore", ecore, "--instance", instance, "--filter-expr", "eclass == 'BusinessComponent'"]
+    argv.extend(workers)
+    for flag, path in outputs.items():
+        argv.extend([flag, str(path)])
+    code = emf_cli.main(argv)
+    assert code == 0
+    payload = json.loads(outputs["--export-json"].read_text(encoding="utf-8"))
+    assert [entry["id"] for entry in payload] == ["_account", "_party"]
+    assert all(entry["eClass"] == "BusinessComponent" for entry in payload)
+    edges = outputs["--export-edges"].read_text(encoding="utf-8").splitlines()
+    assert edges[1:] == [
+        "_account,BusinessComponent,related,_party,BusinessComponent,False",
+        "_party,BusinessComponent,related,_account,BusinessComponent,False",
+    ]
+    mermaid = outputs["--export-mermaid"].read_text(encoding="utf-8").splitlines()
+    assert "  _account --> _party" in mermaid
+    assert "  _party --> _account" in mermaid
+    gml = outputs["--export-gml"].read_text(encoding="utf-8")
+    assert gml.count("node [") == 2
+    assert gml.count("edge [") == 2
+
+
 def test_cli_prune_dry_run_json(tmp_path):
     _skip_if_missing(ECORE)
     out = tmp_path / "prune_preview.json"
@@ -81,3 +179,35 @@ def test_xsd_enrich_trace(tmp_path):
     assert code == 0
     assert out.exists()
     assert out.stat().st_size > 0
+
+
+def test_cli_unused_bad_filter_is_ignored(tmp_path, mini_model):
+    ecore, instance = mini_model
+    out = tmp_path / "objects.json"
+    code = emf_cli.main([
+        "--ecore",
+        ecore,
+        "--instance",
+        instance,
+        "--export-json",
+        str(out),
+        "--dump-instances-filter",
+        "__import__('os')",
+    ])
+    assert code == 0
+    assert len(json.loads(out.read_text(encoding="utf-8"))) == 4
+
+
+def test_cli_bad_filter_for_requested_output_fails(tmp_path, mini_model):
+    ecore, instance = mini_model
+    code = emf_cli.main([
+        "--ecore",
+        ecore,
+        "--instance",
+        instance,
+        "--dump-instances-json",
+        str(tmp_path / "instances.json"),
+        "--dump-instances-filter",
+        "__import__('os')",
+    ])
+    assert code == 2
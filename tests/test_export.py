@@ -0,0 +1,178 @@
+import csv
+import dataclasses
+import json
+from pathlib import Path
+
+import pytest
+
+from emf_reader import export
+from emf_reader.export import (
+    ExportPlan,
+    ObjectInfo,
+    build_object_graph,
+    export_edges,
+    export_json,
+    run_export_plan,
+    write_json,
+)
+from emf_reader.loader import load_instance, load_metamodel
+
+FILTER = "eclass == 'BusinessComponent'"
+
+
+def _mini_roots(mini_model):
+    ecore, instance = mini_model
+    rset, _ = load_metamodel(ecore)
+    return list(load_instance(instance, rset).contents)
+
+
+def _read_csv(path: Path) -> list[dict[str, str]]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_export_json_count_matches_file(tmp_path, mini_model):
+    out = tmp_path / "objects.json"
+    count, metrics = export_json(_mini_roots(mini_model), str(out), filter_expr=FILTER)
+    payload = json.loads(out.read_text(encoding="utf-8"))
+    assert count == len(payload) == 2
+    assert [entry["id"] for entry in payload] == ["_account", "_party"]
+    assert metrics is None
+
+
+def test_export_json_unfiltered_count_matches_file(tmp_path, mini_model):
+    out = tmp_path / "objects.json"
+    count, _ = export_json(_mini_roots(mini_model), str(out))
+    payload = json.loads(out.read_text(encoding="utf-8"))
+    assert count == len(payload) == 4
+    assert payload[0]["containment"] == ["_account", "_party"]
+    assert payload[1]["path"] == "/Repository[0]/components[0]"
+
+
+def test_export_edges_count_matches_file(tmp_path, mini_model):
+    out = tmp_path / "edges.csv"
+    count, _ = export_edges(_mini_roots(mini_model), str(out), filter_expr=FILTER)
+    rows = _read_csv(out)
+    assert count == len(rows) == 2
+    assert all(row["src_class"] == row["dst_class"] == "BusinessComponent" for row in rows)
+
+
+def test_run_export_plan_threaded_matches_sequential(tmp_path, mini_model):
+    roots = _mini_roots(mini_model)
+    names = ("graph.mmd", "graph.gml", "objects.json", "edges.csv")
+    outputs = {}
+    for workers in (1, 4):
+        out = tmp_path / f"workers-{workers}"
+        out.mkdir()
+        plan = ExportPlan(
+            mermaid=str(out / "graph.mmd"),
+            gml=str(out / "graph.gml"),
+            json=str(out / "objects.json"),
+            edges=str(out / "edges.csv"),
+        )
+        results = run_export_plan(roots, plan, filter_expr=FILTER, max_workers=workers)
+        assert results["json"][0] == 2
+        assert results["edges"][0] == 2
+        assert results["mermaid"]["nodes"] == 2
+        outputs[workers] = [(out / name).read_bytes() for name in names]
+    assert outputs[1] == outputs[4]
+
+
+def test_export_json_skip_defaults_keeps_only_set_attributes(tmp_path, mini_model):
+    roots = _mini_roots(mini_model)
+    # Explicitly set to its default value: still counts as set, so it is kept.
+    roots[0].components[1].status = "Provisionally"
+    full_out = tmp_path / "full.json"
+    sparse_out = tmp_path / "sparse.json"
+    export_json(roots, str(full_out))
+    export_json(roots, str(sparse_out), skip_defaults=True)
+    full = json.loads(full_out.read_text(encoding="utf-8"))
+    sparse = json.loads(sparse_out.read_text(encoding="utf-8"))
+    assert [entry["id"] for entry in sparse] == [entry["id"] for entry in full]
+    for full_entry, sparse_entry in zip(full, sparse):
+        for name, value in sparse_entry["attributes"].items():
+            assert full_entry["attributes"][name] == value
+    attributes = {entry["id"]: entry["attributes"] for entry in sparse}
+    assert attributes["_account"] == {"name": "Account", "definition": "An account"}
+    assert attributes["_party"] == {"name": "Party", "status": "Provisionally"}
+    assert full[1]["attributes"]["status"] == "Provisionally"
+
+
+@pytest.mark.parametrize("use_orjson", [False, True])
+def test_write_json_encoders_agree(tmp_path, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(export, "orjson", None)
+    out = tmp_path / "out.json"
+    write_json(
+        {
+            "text": "café",
+            "values": [float("nan"), 2**70, 1.5, {"big": -(2**70), "name": "Zürich"}],
+            "nested": {"inf": float("inf")},
+        },
+        str(out),
+    )
+    expected = {
+        "text": "café",
+        "values": [None, 2**70, 1.5, {"big": -(2**70), "name": "Zürich"}],
+        "nested": {"inf": None},
+    }
+    assert out.read_bytes() == json.dumps(expected, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def test_export_edges_includes_reference_rows(tmp_path, mini_model):
+    out = tmp_path / "edges.csv"
+    count, _ = export_edges(_mini_roots(mini_model), str(out))
+    rows = _read_csv(out)
+    assert count == len(rows) == 6
+    references = [
+        (row["src_id"], row["feature"], row["dst_id"], row["dst_class"])
+        for row in rows
+        if row["containment"] == "False"
+    ]
+    # Both ends use the preferred (xmi:id) ids, like the containment rows.
+    assert sorted(references) == [
+        ("_account", "related", "_party", "BusinessComponent"),
+        ("_owner", "type", "_party", "BusinessComponent"),
+        ("_party", "related", "_account", "BusinessComponent"),
+    ]
+
+
+def test_export_edges_keeps_reference_rows_between_filtered_objects(tmp_path, mini_model):
+    out = tmp_path / "edges.csv"
+    count, _ = export_edges(_mini_roots(mini_model), str(out), filter_expr=FILTER)
+    rows = _read_csv(out)
+    assert count == 2
+    assert sorted((row["src_id"], row["dst_id"]) for row in rows) == [
+        ("_account", "_party"),
+        ("_party", "_account"),
+    ]
+    assert {row["containment"] for row in rows} == {"False"}
+
+
+def test_object_info_keeps_its_path_keyword(mini_model):
+    objects, _ = build_object_graph(_mini_roots(mini_model))
+    info = objects[2]
+    legacy = ObjectInfo(obj=info.obj, obj_id=info.obj_id, path=info.path)
+    assert legacy.path == info.path == "/Repository[0]/components[0]/elements[0]"
+    assert legacy == info
+    assert repr(legacy) == repr(info)
+    assert ObjectInfo(info.obj, info.obj_id, "/elements[0]") != info
+
+
+def test_object_info_dataclass_helpers_see_the_joined_path():
+    root = ObjectInfo("repo", "o1", "/Repository[0]")
+    child = ObjectInfo("account", "o2", "/components[0]", root)
+    assert [field.name for field in dataclasses.fields(child)] == ["obj", "obj_id", "path"]
+    assert dataclasses.asdict(child) == {
+        "obj": "account",
+        "obj_id": "o2",
+        "path": "/Repository[0]/components[0]",
+    }
+
+    moved = dataclasses.replace(child, obj_id="o9")
+    assert (moved.obj, moved.obj_id, moved.path) == ("account", "o9", child.path)
+    assert moved.parent is None
+    assert moved != child
+    assert dataclasses.replace(child) == child
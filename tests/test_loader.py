@@ -0,0 +1,81 @@
+from emf_reader.loader import class_index, load_instance, load_metamodel, load_metamodel_index
+
+
+def test_class_index_groups_instances(mini_model):
+    ecore, instance = mini_model
+    rset, _ = load_metamodel(ecore)
+    resource = load_instance(instance, rset)
+    index = class_index(resource)
+    assert {name: len(objs) for name, objs in index.items()} == {
+        "Repository": 1,
+        "BusinessComponent": 2,
+        "BusinessElement": 1,
+    }
+    assert [obj.name for obj in index["BusinessComponent"]] == ["Account", "Party"]
+
+
+def test_class_index_reflects_mutations(mini_model):
+    ecore, instance = mini_model
+    rset, _ = load_metamodel(ecore)
+    resource = load_instance(instance, rset)
+    repository = resource.contents[0]
+    assert len(class_index(resource)["BusinessComponent"]) == 2
+
+    component_class = repository.components[0].eClass
+    repository.components.append(component_class(name="Added"))
+    assert [obj.name for obj in class_index(resource)["BusinessComponent"]] == [
+        "Account",
+        "Party",
+        "Added",
+    ]
+
+    repository.components.remove(repository.components[0])
+    index = class_index(resource)
+    assert [obj.name for obj in index["BusinessComponent"]] == ["Party", "Added"]
+    assert "BusinessElement" not in index
+
+
+_BASE_ECORE = """<?xml version="1.0" encoding="UTF-8"?>
+<ecore:EPackage xmi:version="2.0" xmlns:xmi="http://www.omg.org/XMI"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:ecore="http://www.eclipse.org/emf/2002/Ecore" name="base" nsURI="urn:base" nsPrefix="base">
+  <eClassifiers xsi:type="ecore:EClass" name="Named">
+{features}  </eClassifiers>
+</ecore:EPackage>
+"""
+
+_MAIN_ECORE = """<?xml version="1.0" encoding="UTF-8"?>
+<ecore:EPackage xmi:version="2.0" xmlns:xmi="http://www.omg.org/XMI"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:ecore="http://www.eclipse.org/emf/2002/Ecore" name="main" nsURI="urn:main" nsPrefix="main">
+  <eClassifiers xsi:type="ecore:EClass" name="Thing" eSuperTypes="base.ecore#//Named"/>
+</ecore:EPackage>
+"""
+
+
+def _attribute(name):
+    return (
+        f'    <eStructuralFeatures xsi:type="ecore:EAttribute" name="{name}"\n'
+        '        eType="ecore:EDataType http://www.eclipse.org/emf/2002/Ecore#//EString"/>\n'
+    )
+
+
+def test_metamodel_index_cache_tracks_referenced_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    base = tmp_path / "base.ecore"
+    main = tmp_path / "main.ecore"
+    base.write_text(_BASE_ECORE.format(features=_attribute("name")), encoding="utf-8")
+    main.write_text(_MAIN_ECORE, encoding="utf-8")
+
+    def thing_attributes():
+        index = load_metamodel_index(str(main))
+        [thing] = index["packages"][0]["classes"]
+        return sorted(attr["name"] for attr in thing["attributes"])
+
+    assert thing_attributes() == ["name"]
+    base.write_text(
+        _BASE_ECORE.format(features=_attribute("name") + _attribute("code")), encoding="utf-8"
+    )
+    # main.ecore is untouched, but its supertype gained an attribute.
+    assert thing_attributes() == ["code", "name"]
+    assert len(list((tmp_path / "cache" / "emf_reader").glob("*.pkl"))) == 1
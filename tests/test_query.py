@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from pyecore.ecore import EAttribute, EClass, EPackage, EReference, EString
+
+from emf_reader.export import build_object_graph, export_json
+from emf_reader.query import build_context, build_predicate, class_test_applies
+
+
+@pytest.mark.parametrize(
+    ("expr", "expected"),
+    [
+        ("eclass == 'Doc'", {"Doc"}),
+        ("eclass in ['Doc', 'Note']", {"Doc", "Note"}),
+        ("eclass in ('Doc',)", {"Doc"}),
+        ("eclass in {'Doc', 'Note'}", {"Doc", "Note"}),
+        ("is_class('Doc')", {"Doc"}),
+        ("is_class('Doc') or eclass == 'Note'", {"Doc", "Note"}),
+        ("eclass in ['Doc'] or is_class('Note') or eclass == 'Folder'", {"Doc", "Note", "Folder"}),
+        # Substring test on a string, not class-name membership.
+        ("eclass in 'Document'", None),
+        ("eclass == 1", None),
+        ("eclass == 'Doc' and name == 'x'", None),
+        ("is_class('Doc') or name == 'x'", None),
+        ("is_kind_of('Doc')", None),
+    ],
+)
+def test_class_names_only_for_pure_class_tests(expr, expected):
+    class_names = build_predicate(expr).class_names
+    assert class_names == (frozenset(expected) if expected is not None else None)
+
+
+def _model():
+    package = EPackage("q", nsURI="urn:q", nsPrefix="q")
+    item = EClass("Item")
+    doc = EClass("Doc", superclass=(item,))
+    document = EClass("Document", superclass=(item,))
+    note = EClass("Note", superclass=(item,))
+    # An attribute named ``eclass`` shadows the class name in the context.
+    odd = EClass("Odd", superclass=(item,))
+    odd.eStructuralFeatures.append(EAttribute("eclass", EString))
+    folder = EClass("Folder")
+    folder.eStructuralFeatures.append(EReference("items", item, upper=-1, containment=True))
+    package.eClassifiers.extend([item, doc, document, note, odd, folder])
+    root = folder()
+    root.items.extend([doc(), document(), note(), odd(eclass="Doc")])
+    return root, odd
+
+
+def test_class_test_applies_unless_shadowed():
+    root, odd = _model()
+    assert class_test_applies(root.eClass)
+    assert not class_test_applies(odd)
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "eclass == 'Doc'",
+        "eclass in ['Doc', 'Note']",
+        "eclass in 'Document'",
+        "is_class('Doc')",
+        "is_class('Doc') or eclass == 'Note'",
+        "eclass == 'Doc' or eclass in ('Folder',)",
+    ],
+)
+def test_filter_matches_full_evaluation(tmp_path, expr):
+    root, _ = _model()
+    predicate = build_predicate(expr)
+    objects, _ = build_object_graph([root])
+    expected = [
+        info.obj_id
+        for info in objects
+        if predicate(build_context(info.obj, info.obj_id, info.path))
+    ]
+    out = tmp_path / "objects.json"
+    export_json([root], str(out), filter_expr=expr)
+    assert [entry["local_id"] for entry in json.loads(out.read_text(encoding="utf-8"))] == expected
+
+
+def test_shadowed_eclass_uses_the_attribute(tmp_path):
+    root, _ = _model()
+    out = tmp_path / "objects.json"
+    export_json([root], str(out), filter_expr="eclass == 'Doc'")
+    payload = json.loads(out.read_text(encoding="utf-8"))
+    assert [entry["eClass"] for entry in payload] == ["Doc", "Odd"]
@@ -0,0 +1,78 @@
+from lxml import etree
+
+from emf_reader.xsd_enrich import XSD_NS, enrich_xsd
+
+_STRING = "ecore:EDataType http://www.eclipse.org/emf/2002/Ecore#//EString"
+
+REPOSITORY_ECORE = f"""<?xml version="1.0" encoding="UTF-8"?>
+<ecore:EPackage xmi:version="2.0" xmlns:xmi="http://www.omg.org/XMI"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:ecore="http://www.eclipse.org/emf/2002/Ecore" name="repo" nsURI="urn:repo" nsPrefix="repo">
+  <eClassifiers xsi:type="ecore:EClass" name="Repository">
+    <eStructuralFeatures xsi:type="ecore:EReference" name="components" upperBound="-1"
+        eType="#//MessageComponent" containment="true"/>
+  </eClassifiers>
+  <eClassifiers xsi:type="ecore:EClass" name="MessageComponent">
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="name" eType="{_STRING}"/>
+    <eStructuralFeatures xsi:type="ecore:EReference" name="messageElement" upperBound="-1"
+        eType="#//MessageElement" containment="true"/>
+  </eClassifiers>
+  <eClassifiers xsi:type="ecore:EClass" name="MessageElement" abstract="true">
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="name" eType="{_STRING}"/>
+    <eStructuralFeatures xsi:type="ecore:EAttribute" name="xmlTag" eType="{_STRING}"/>
+  </eClassifiers>
+  <eClassifiers xsi:type="ecore:EClass" name="MessageAttribute" eSuperTypes="#//MessageElement"/>
+  <eClassifiers xsi:type="ecore:EClass" name="MessageAssociationEnd" eSuperTypes="#//MessageElement"/>
+</ecore:EPackage>
+"""
+
+# ``Amt`` in the Acct complex type is Acct's own ``Amount`` element; another
+# component has an element literally named ``Amt``, of a preferred class.
+REPOSITORY_INSTANCE = """<?xml version="1.0" encoding="UTF-8"?>
+<repo:Repository xmi:version="2.0" xmlns:xmi="http://www.omg.org/XMI"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:repo="urn:repo" xmi:id="_repo">
+  <components xmi:id="_acct" name="Acct">
+    <messageElement xsi:type="repo:MessageAttribute" xmi:id="_acct_amount" name="Amount" xmlTag="Amt"/>
+  </components>
+  <components xmi:id="_other" name="Other">
+    <messageElement xsi:type="repo:MessageAssociationEnd" xmi:id="_other_amt" name="Amt" xmlTag="Amt"/>
+  </components>
+</repo:Repository>
+"""
+
+SCHEMA = f"""<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="{XSD_NS}" targetNamespace="urn:example">
+  <xs:complexType name="Acct">
+    <xs:sequence>
+      <xs:element name="Amt" type="xs:string"/>
+    </xs:sequence>
+  </xs:complexType>
+</xs:schema>
+"""
+
+
+def _appinfo(element: etree._Element, source: str) -> str | None:
+    for appinfo in element.findall(f"{{{XSD_NS}}}annotation/{{{XSD_NS}}}appinfo"):
+        if appinfo.get("source") == source:
+            return appinfo.text
+    return None
+
+
+def test_enrich_xsd_matches_elements_within_their_parent(tmp_path):
+    ecore = tmp_path / "repo.ecore"
+    instance = tmp_path / "repo.xmi"
+    xsd = tmp_path / "schema.xsd"
+    output = tmp_path / "enriched.xsd"
+    ecore.write_text(REPOSITORY_ECORE, encoding="utf-8")
+    instance.write_text(REPOSITORY_INSTANCE, encoding="utf-8")
+    xsd.write_text(SCHEMA, encoding="utf-8")
+
+    stats = enrich_xsd(str(ecore), str(instance), str(xsd), str(output))
+
+    assert stats == {"annotated": 2, "missing": 0, "total": 2}
+    root = etree.parse(str(output)).getroot()
+    complex_type = root.find(f"{{{XSD_NS}}}complexType")
+    element = complex_type.find(f".//{{{XSD_NS}}}element")
+    assert _appinfo(complex_type, "xmi:id") == "_acct"
+    assert _appinfo(element, "xmi:id") == "_acct_amount"
+    assert _appinfo(element, "parent") == "_acct"